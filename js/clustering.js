@@ -0,0 +1,86 @@
+// Consensus clustering of located findings. scripts/consensus_clustering.py
+// implements the same rule for the precomputed consensus items, both are
+// checked against tests/fixtures/clustering.json.
+
+// Groups of overlapping quotes: sorted by start, a finding joins the current
+// group as long as it starts before the largest end seen in the group
+function overlapGroups(findings) {
+    const sorted = [...findings].sort((a, b) => a.start - b.start);
+    const groups = [];
+    sorted.forEach(finding => {
+        const group = groups[groups.length - 1];
+        if (group && finding.start < group.end) {
+            group.end = Math.max(group.end, finding.end);
+            group.centerSum += finding.center;
+            group.findings.push(finding);
+        } else {
+            groups.push({
+                start: finding.start,
+                end: finding.end,
+                centerSum: finding.center,
+                findings: [finding]
+            });
+        }
+    });
+    return groups;
+}
+
+export function clusterFindings(yearData, tolerance) {
+    return yearData.map(party => {
+        let raw = party.raw_findings || [];
+        if (raw.length === 0) return { ...party, items: [] };
+
+        // Ensure numbers and calculate center
+        raw = raw.map(r => ({
+            ...r,
+            start: parseInt(r.start),
+            end: parseInt(r.end),
+            center: (parseInt(r.start) + parseInt(r.end)) / 2
+        }));
+
+        const clusters = [];
+        let currentCluster = null;
+
+        overlapGroups(raw).forEach(group => {
+            if (currentCluster) {
+                // Distance of the mean centers (slider value treated as total diameter, so radius is half).
+                // Overlapping quotes are always in the same group, even if tolerance is 0.
+                const distance = Math.abs(group.centerSum / group.findings.length - currentCluster.centerSum / currentCluster.findings.length);
+                if (distance <= (tolerance / 2)) {
+                    currentCluster.end = Math.max(currentCluster.end, group.end);
+                    currentCluster.centerSum += group.centerSum;
+                    currentCluster.findings.push(...group.findings);
+                    return;
+                }
+                clusters.push(finalizeCluster(currentCluster, party.total_models));
+            }
+            currentCluster = group;
+        });
+
+        if (currentCluster) {
+            clusters.push(finalizeCluster(currentCluster, party.total_models));
+        }
+
+        return {
+            ...party,
+            items: clusters
+        };
+    });
+}
+
+function finalizeCluster(cluster, totalModels) {
+    // Find representative finding (longest quote?), its text is in the snippet table
+    const longest = cluster.findings.reduce((a, b) => (a.end - a.start) > (b.end - b.start) ? a : b);
+    const models = new Set(cluster.findings.map(f => f.model));
+
+    return {
+        representative: longest,
+        snippet: longest.snippet,
+        start: cluster.start,
+        end: cluster.end,
+        vote_count: models.size,
+        total_models: totalModels,
+        confidence: models.size / totalModels,
+        findings: cluster.findings
+    };
+}
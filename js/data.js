@@ -1,8 +1,8 @@
 import { state } from './state.js';
-import { updatePartyColors } from './utils.js';
+import { updatePartyColors, assetUrl } from './utils.js';
 
 export function loadColors() {
-    return fetch('colors.json?v=' + new Date().getTime())
+    return fetch(assetUrl('colors.json'))
         .then(response => response.json())
         .then(colors => {
             updatePartyColors(colors);
@@ -12,7 +12,7 @@ export function loadColors() {
 }
 
 export function loadConfig() {
-    return fetch('config.json?v=' + new Date().getTime())
+    return fetch(assetUrl('config.json'))
         .then(response => response.json())
         .then(config => {
             state.globalConfig = config;
@@ -22,7 +22,7 @@ export function loadConfig() {
 }
 
 export function loadDistributionData() {
-    return fetch('distribution_analysis.json?v=' + new Date().getTime())
+    return fetch(assetUrl('distribution_analysis.json'))
         .then(response => response.json())
         .then(data => {
             state.globalDistributionData = data;
@@ -32,7 +32,7 @@ export function loadDistributionData() {
 }
 
 export function loadConsensusData() {
-    return fetch('consensus_analysis.json?v=' + new Date().getTime())
+    return fetch(assetUrl('consensus_analysis.json'))
         .then(response => response.json())
         .then(data => {
             state.globalConsensusData = data;
@@ -41,6 +41,16 @@ export function loadConsensusData() {
         .catch(error => console.error('Error loading consensus_analysis.json:', error));
 }
 
+export function loadModelAgreementData() {
+    return fetch(assetUrl('model_agreement.json'))
+        .then(response => response.json())
+        .then(data => {
+            state.globalModelAgreementData = data;
+            return data;
+        })
+        .catch(error => console.error('Error loading model_agreement.json:', error));
+}
+
 export async function loadDataForModel(modelName, year) {
     // Check if already loaded for this year
     if (state.dataCache[modelName] && state.dataCache[modelName][year]) {
@@ -1,10 +1,11 @@
 import { state } from './state.js';
-import { loadConfig, loadColors, loadDistributionData, loadConsensusData, loadDataForModel, analyzeParties } from './data.js';
+import { loadConfig, loadColors, loadDistributionData, loadConsensusData, loadModelAgreementData, loadDataForModel, analyzeParties } from './data.js';
 import { 
     populateYearSelect, populateYearSelectModels, populateModelSelect, populateModelSelectTopics, populatePartySelect, 
     populateMethodologyYearSelect, populateConsensusYearSelect, populateYearSelectTopics, renderPartiesTable, renderTable, 
-    showDetails, renderWordCloud, showTopicDetails, renderTopicTable 
+    showDetails, renderWordCloud, showTopicDetails, renderTopicTable, renderSearchResults, MAX_SEARCH_FINDINGS 
 } from './ui.js';
+import { searchIndex, loadFindings } from './search.js';
 import { 
     renderStrictnessChart, renderMethodologyChart, updatePartiesChart, updateTrendChart, 
     updateModelsChart, renderTopicDistributionChart, renderTopicStackedChart 
@@ -26,6 +27,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const filterSelects = document.querySelectorAll('.filter-mode-select');
     const searchInput = document.getElementById('search-input');
     const searchTopicInput = document.getElementById('search-topic-input');
+    const searchIndexInput = document.getElementById('search-index-input');
     const detailsSection = document.getElementById('details-section');
 
     // --- Initialization ---
@@ -59,7 +61,7 @@ document.addEventListener('DOMContentLoaded', () => {
         .then(() => preloadAllModelData())
         .then(() => {
             initApp();
-            return Promise.all([loadDistributionData(), loadConsensusData()]);
+            return Promise.all([loadDistributionData(), loadConsensusData(), loadModelAgreementData()]);
         })
         .then(([distributionData, consensusData]) => {
             populateMethodologyYearSelect(distributionData);
@@ -146,6 +148,7 @@ document.addEventListener('DOMContentLoaded', () => {
         // Initial load for topics (all years)
         updateTopicsView('all', 'all');
         searchInput.addEventListener('input', handleSearch);
+        searchIndexInput.addEventListener('input', handleIndexSearch);
 
         // Listen for parties table filter events from chart clicks
         window.addEventListener('filterPartiesTable', (e) => {
@@ -218,6 +221,25 @@ document.addEventListener('DOMContentLoaded', () => {
         renderTable(filteredItems);
     }
 
+    let indexSearchTimer = null;
+    let indexSearchId = 0;
+
+    function handleIndexSearch(e) {
+        const query = e.target.value;
+        clearTimeout(indexSearchTimer);
+        indexSearchTimer = setTimeout(async () => {
+            // Ignore results of queries that were overtaken by later input
+            const searchId = ++indexSearchId;
+            try {
+                const results = await searchIndex(query);
+                const findings = await loadFindings(results.findingIds.slice(0, MAX_SEARCH_FINDINGS));
+                if (searchId === indexSearchId) renderSearchResults(results, findings);
+            } catch (err) {
+                console.error('Error searching the index:', err);
+            }
+        }, 150);
+    }
+
     function handleFilterChange() {
         // View 1
         if (selectModel.value && selectYear.value) {
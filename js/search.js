@@ -0,0 +1,187 @@
+// Client of the sharded search index built by scripts/build_search_index.py.
+// Tokenizer and shard hash must stay in sync with the Python side
+// (checked against tests/fixtures/search_tokenizer.json).
+
+import { assetUrl } from './utils.js';
+
+const INDEX_DIR = 'search';
+const TOKEN_PATTERN = /[\p{L}\p{N}_]+(?:-[\p{L}\p{N}_]+)*/gu;
+const FOLDING = { 'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss' };
+const PROXIMITY = 300; // Max. byte distance of the query words in a program text hit
+const SNIPPET_CONTEXT = 120; // Bytes before/after a hit fetched for the snippet
+
+let manifestPromise = null;
+const shardCache = new Map();
+const chunkCache = new Map();
+
+function fetchJson(url) {
+    return fetch(url).then(res => {
+        if (!res.ok) throw new Error(`Failed to load ${url}: ${res.statusText}`);
+        return res.json();
+    });
+}
+
+// The static build lists the content-hashed names of shards and chunks in the manifest
+function indexUrl(manifest, name) {
+    return manifest.files ? `${INDEX_DIR}/${manifest.files[name]}` : assetUrl(`${INDEX_DIR}/${name}`);
+}
+
+export function loadSearchManifest() {
+    if (!manifestPromise) {
+        manifestPromise = fetchJson(assetUrl(`${INDEX_DIR}/manifest.json`)).catch(err => {
+            manifestPromise = null;
+            throw err;
+        });
+    }
+    return manifestPromise;
+}
+
+function cached(cache, key, load) {
+    if (!cache.has(key)) {
+        cache.set(key, load().catch(err => {
+            cache.delete(key);
+            throw err;
+        }));
+    }
+    return cache.get(key);
+}
+
+export function fold(word) {
+    return word.normalize('NFC').toLowerCase().replace(/[äöüß]/g, ch => FOLDING[ch]);
+}
+
+export function tokenize(text, manifest) {
+    const stopwords = new Set(manifest.stopwords);
+    const terms = [];
+    for (const match of text.matchAll(TOKEN_PATTERN)) {
+        // Same order as the Python tokenize(): the joined word, then its parts
+        const parts = fold(match[0]).split('-');
+        if (parts.length > 1) terms.push(parts.join(''));
+        parts.forEach(part => {
+            if (part.length >= manifest.minTermLength && !stopwords.has(part)) terms.push(part);
+        });
+    }
+    return terms;
+}
+
+// FNV-1a (32 bit) over the code points of the term prefix
+export function shardFor(term, manifest) {
+    let h = 0x811c9dc5;
+    for (const ch of Array.from(term).slice(0, manifest.prefixLength)) {
+        h = Math.imul(h ^ ch.codePointAt(0), 0x01000193) >>> 0;
+    }
+    return h % manifest.shards;
+}
+
+function deltaDecode(values, from = 0) {
+    const result = [];
+    let value = 0;
+    for (let i = from; i < values.length; i++) {
+        value += values[i];
+        result.push(value);
+    }
+    return result;
+}
+
+// Postings of all index terms matching a query word: words with at least
+// prefixLength characters match as prefix, shorter words only exactly
+async function lookupTerm(word, manifest) {
+    const n = shardFor(word, manifest);
+    const shard = await cached(shardCache, n, () => fetchJson(indexUrl(manifest, `shards/${n}.json`)));
+
+    const isPrefix = Array.from(word).length >= manifest.prefixLength;
+    const findings = new Set();
+    const programs = new Map(); // document id -> Set(byte offsets)
+
+    for (const [term, entry] of Object.entries(shard)) {
+        if (isPrefix ? !term.startsWith(word) : term !== word) continue;
+        if (entry.f) deltaDecode(entry.f).forEach(id => findings.add(id));
+        (entry.p || []).forEach(posting => {
+            if (!programs.has(posting[0])) programs.set(posting[0], new Set());
+            const offsets = programs.get(posting[0]);
+            deltaDecode(posting, 1).forEach(offset => offsets.add(offset));
+        });
+    }
+    return { findings, programs };
+}
+
+function hasNear(sortedOffsets, offset) {
+    // Binary search for the first offset >= offset - PROXIMITY
+    let lo = 0;
+    let hi = sortedOffsets.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (sortedOffsets[mid] < offset - PROXIMITY) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo < sortedOffsets.length && sortedOffsets[lo] <= offset + PROXIMITY;
+}
+
+/**
+ * Search findings and program texts. All query words have to match
+ * (in program texts within PROXIMITY bytes of each other).
+ * Returns { terms, findingIds, programs: [{ document, offsets }] }.
+ */
+export async function searchIndex(query) {
+    const manifest = await loadSearchManifest();
+    const terms = [...new Set(tokenize(query, manifest))];
+    if (terms.length === 0) return { terms, findingIds: [], programs: [] };
+
+    const postings = await Promise.all(terms.map(term => lookupTerm(term, manifest)));
+
+    // Rarest word first, it bounds the intersection
+    postings.sort((a, b) => a.findings.size - b.findings.size);
+    const findingIds = [...postings[0].findings]
+        .filter(id => postings.every(p => p.findings.has(id)))
+        .sort((a, b) => a - b);
+
+    const programs = [];
+    const [first, ...others] = postings;
+    const otherOffsets = others.map(p => new Map([...p.programs].map(([doc, offsets]) => [doc, [...offsets].sort((a, b) => a - b)])));
+    first.programs.forEach((offsets, doc) => {
+        if (!otherOffsets.every(p => p.has(doc))) return;
+        const hits = [...offsets]
+            .sort((a, b) => a - b)
+            .filter(offset => otherOffsets.every(p => hasNear(p.get(doc), offset)));
+        if (hits.length > 0) programs.push({ document: { id: doc, ...manifest.documents[doc] }, offsets: hits });
+    });
+    programs.sort((a, b) => b.offsets.length - a.offsets.length);
+
+    return { terms, findingIds, programs };
+}
+
+export async function loadFindings(ids) {
+    const manifest = await loadSearchManifest();
+    const chunks = [...new Set(ids.map(id => Math.floor(id / manifest.findingsPerChunk)))];
+    const loaded = await Promise.all(chunks.map(n => cached(chunkCache, n, () => fetchJson(indexUrl(manifest, `findings/${n}.json`)))));
+
+    const byChunk = new Map(chunks.map((n, i) => [n, loaded[i]]));
+    return ids.map(id => ({ id, ...byChunk.get(Math.floor(id / manifest.findingsPerChunk))[id % manifest.findingsPerChunk] }));
+}
+
+/**
+ * Text around a byte offset of a program text, fetched with a Range request.
+ * Returns { before, hit, after } with hit being the word at the offset.
+ */
+export async function fetchSnippet(document, offset) {
+    const start = Math.max(0, offset - SNIPPET_CONTEXT);
+    const end = offset + SNIPPET_CONTEXT;
+    const res = await fetch(document.path, { headers: { Range: `bytes=${start}-${end - 1}` } });
+    if (!res.ok) throw new Error(`Failed to load ${document.path}: ${res.statusText}`);
+
+    let bytes = new Uint8Array(await res.arrayBuffer());
+    if (res.status !== 206) bytes = bytes.subarray(start, end); // Server ignored the Range header
+
+    const decoder = new TextDecoder('utf-8');
+    // Cut characters split at the range borders (decoded as U+FFFD)
+    const before = decoder.decode(bytes.subarray(0, offset - start)).replace(/^�+/, '');
+    const rest = decoder.decode(bytes.subarray(offset - start)).replace(/�+$/, '');
+    const word = rest.match(TOKEN_PATTERN);
+    const hitLength = word && rest.startsWith(word[0]) ? word[0].length : 0;
+
+    return {
+        before: before.replace(/\s+/g, ' '),
+        hit: rest.slice(0, hitLength),
+        after: rest.slice(hitLength).replace(/\s+/g, ' ')
+    };
+}
@@ -11,6 +11,7 @@ export const state = {
     globalConfig: null,
     globalDistributionData: null,
     globalConsensusData: null,
+    globalModelAgreementData: null,
     allPartiesSet: new Set(),
     currentFilterMode: 'all',
     
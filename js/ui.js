@@ -1,5 +1,7 @@
 import { state } from './state.js';
-import { escapeHtml } from './utils.js';
+import { escapeHtml, findingSnippet } from './utils.js';
+import { clusterFindings } from './clustering.js';
+import { fetchSnippet } from './search.js';
 import { renderTopicDistributionChart, renderMethodologyChart, renderStrictnessChart, renderConsensusChart, renderProximityChart } from './charts.js';
 
 export function populateYearSelect(years) {
@@ -200,6 +202,12 @@ export function renderConsensusView(year, radius = 0, filter = null) {
                 return categoryMatch && modelMatch;
             });
         }
+
+        // The baseline (rule based reference model) doesn't vote, it is only compared with the clusters
+        if (party.baseline_findings) {
+            party.baseline_findings = party.baseline_findings.filter(f =>
+                filterMode === 'all' || (f.category && f.category.toLowerCase().includes('explizit')));
+        }
     });
 
     // 2. Calculate Dynamic Clusters (Type 2)
@@ -209,7 +217,7 @@ export function renderConsensusView(year, radius = 0, filter = null) {
     renderProximityChart(clusteredData);
 
     // 3b. Render Model Consensus Metric
-    renderModelConsensusMetric(clusteredData);
+    renderModelConsensusMetric(clusteredData, year, selectedModels, filterMode, radius);
 
     // 4. Render List
     renderConsensusList(clusteredData, radius, filter);
@@ -306,6 +314,7 @@ function renderConsensusList(clusteredData, radius, filter) {
             }
             
             li.style.borderLeft = `4px solid ${color}`;
+            const snippet = findingSnippet(partyData, item.representative);
             
             const headerDiv = document.createElement('div');
             headerDiv.style.display = 'flex';
@@ -331,7 +340,7 @@ function renderConsensusList(clusteredData, radius, filter) {
             // Add Source Link if available
             if (partyData.source_file) {
                 const sourceLink = document.createElement('a');
-                const searchPhrase = item.text.replace(/\s+/g, ' ').trim();
+                const searchPhrase = snippet.hit.replace(/\s+/g, ' ').trim();
                 const encodedSearch = encodeURIComponent(searchPhrase);
                 sourceLink.href = `${partyData.source_file}#:~:text=${encodedSearch}`;
                 sourceLink.target = '_blank';
@@ -343,13 +352,27 @@ function renderConsensusList(clusteredData, radius, filter) {
                 headerDiv.appendChild(sourceLink);
             }
 
+            // Deep link to the PDF page of the quote (pdf_pages.json)
+            if (partyData.pdf_file && item.representative.page) {
+                const pdfLink = document.createElement('a');
+                pdfLink.href = `${partyData.pdf_file}#page=${item.representative.page}`;
+                pdfLink.target = '_blank';
+                pdfLink.title = `Im PDF öffnen (Seite ${item.representative.page})`;
+                pdfLink.textContent = `📑 S. ${item.representative.page}`;
+                pdfLink.style.marginLeft = '10px';
+                pdfLink.style.textDecoration = 'none';
+                pdfLink.onclick = (e) => e.stopPropagation(); // Prevent toggling details
+                headerDiv.appendChild(pdfLink);
+            }
+
             headerDiv.appendChild(expandBtn);
             li.appendChild(headerDiv);
 
             const quote = document.createElement('blockquote');
             quote.style.margin = '0';
             quote.style.fontStyle = 'italic';
-            quote.textContent = `"${item.text}"`;
+            // Hit highlighted within its surrounding text
+            quote.innerHTML = `"...${escapeHtml(snippet.before)}<mark>${escapeHtml(snippet.hit)}</mark>${escapeHtml(snippet.after)}..."`;
             li.appendChild(quote);
 
             const details = document.createElement('div');
@@ -357,6 +380,7 @@ function renderConsensusList(clusteredData, radius, filter) {
             details.style.marginTop = '5px';
             details.style.color = '#888';
             details.textContent = `Gefunden von ${item.vote_count} / ${item.total_models} Modellen.`;
+            if (snippet.section) details.textContent += ` Abschnitt: ${snippet.section}`;
             li.appendChild(details);
 
             // Hidden details section
@@ -371,7 +395,8 @@ function renderConsensusList(clusteredData, radius, filter) {
                     const fDiv = document.createElement('div');
                     fDiv.style.marginBottom = '5px';
                     fDiv.style.fontSize = '0.85em';
-                    fDiv.innerHTML = `<strong>${f.model}:</strong> "${f.text}"`;
+                    fDiv.innerHTML = `<strong>${escapeHtml(f.model)}:</strong> "${escapeHtml(findingSnippet(partyData, f).hit)}"` +
+                        (f.page ? ` (S. ${f.page})` : '');
                     findingsList.appendChild(fDiv);
                 });
             }
@@ -391,94 +416,6 @@ function renderConsensusList(clusteredData, radius, filter) {
     });
 }
 
-function clusterFindings(yearData, tolerance) {
-    return yearData.map(party => {
-        let raw = party.raw_findings || [];
-        if (raw.length === 0) return { ...party, items: [] };
-
-        // Ensure numbers and calculate center
-        raw = raw.map(r => ({
-            ...r,
-            start: parseInt(r.start),
-            end: parseInt(r.end),
-            center: (parseInt(r.start) + parseInt(r.end)) / 2
-        }));
-
-        // Sort by center position
-        raw.sort((a, b) => a.center - b.center);
-
-        const clusters = [];
-        let currentCluster = null;
-
-        raw.forEach(finding => {
-            if (!currentCluster) {
-                currentCluster = {
-                    start: finding.start,
-                    end: finding.end,
-                    centerSum: finding.center, // Track sum for average center
-                    count: 1,
-                    findings: [finding],
-                    models: new Set([finding.model])
-                };
-                return;
-            }
-
-            // Calculate distance from cluster center
-            const clusterCenter = currentCluster.centerSum / currentCluster.count;
-            const distance = Math.abs(finding.center - clusterCenter);
-            
-            // Check for overlap
-            const isOverlapping = (finding.start < currentCluster.end) && (finding.end > currentCluster.start);
-
-            // Check if within tolerance (slider value treated as total diameter, so radius is half)
-            // User logic: "100" means "50 < x < 50". So max distance from center is 50.
-            // ALSO: If they overlap, they should always be clustered, even if tolerance is 0.
-            if (isOverlapping || distance <= (tolerance / 2)) {
-                currentCluster.start = Math.min(currentCluster.start, finding.start);
-                currentCluster.end = Math.max(currentCluster.end, finding.end);
-                currentCluster.centerSum += finding.center;
-                currentCluster.count++;
-                currentCluster.findings.push(finding);
-                currentCluster.models.add(finding.model);
-            } else {
-                clusters.push(finalizeCluster(currentCluster, party.total_models));
-                currentCluster = {
-                    start: finding.start,
-                    end: finding.end,
-                    centerSum: finding.center,
-                    count: 1,
-                    findings: [finding],
-                    models: new Set([finding.model])
-                };
-            }
-        });
-
-        if (currentCluster) {
-            clusters.push(finalizeCluster(currentCluster, party.total_models));
-        }
-
-        return {
-            ...party,
-            items: clusters
-        };
-    });
-}
-
-function finalizeCluster(cluster, totalModels) {
-    // Find representative text (longest quote?)
-    const longest = cluster.findings.reduce((a, b) => a.text.length > b.text.length ? a : b);
-    
-    return {
-        text: longest.text,
-        start: cluster.start,
-        end: cluster.end,
-        vote_count: cluster.models.size,
-        total_models: totalModels,
-        confidence: cluster.models.size / totalModels,
-        findings: cluster.findings
-    };
-}
-
 export function populateYearSelectTopics(years) {
     const selectYearTopics = document.getElementById('select-year-topics');
     if (years && Array.isArray(years)) {
@@ -664,29 +601,125 @@ export function renderTopicTable(items) {
     });
 }
 
-function renderModelConsensusMetric(clusteredData) {
+export const MAX_SEARCH_FINDINGS = 200;
+const SNIPPETS_PER_PROGRAM = 3;
+
+export function renderSearchResults(results, findings) {
+    const status = document.getElementById('search-index-status');
+    const findingsContainer = document.getElementById('search-findings-container');
+    const programsContainer = document.getElementById('search-programs-container');
+    const findingsTableBody = document.querySelector('#search-findings-table tbody');
+    const programsList = document.getElementById('search-programs-list');
+
+    findingsTableBody.innerHTML = '';
+    programsList.innerHTML = '';
+
+    if (!results || results.terms.length === 0) {
+        status.textContent = '';
+        findingsContainer.classList.add('hidden');
+        programsContainer.classList.add('hidden');
+        return;
+    }
+
+    const programHits = results.programs.reduce((sum, p) => sum + p.offsets.length, 0);
+    status.textContent = `${results.findingIds.length} Verbote, ${programHits} Treffer in ${results.programs.length} Wahlprogrammen`;
+    if (results.findingIds.length > MAX_SEARCH_FINDINGS) {
+        status.textContent += ` (die ersten ${MAX_SEARCH_FINDINGS} Verbote werden angezeigt)`;
+    }
+
+    findingsContainer.classList.toggle('hidden', findings.length === 0);
+    findings.forEach(item => {
+        const row = document.createElement('tr');
+
+        let locationHtml = escapeHtml(item.location || '');
+        if (item.source && item.quote) {
+            const searchPhrase = item.quote.replace(/\s+/g, ' ').trim();
+            const encodedSearch = encodeURIComponent(searchPhrase);
+            const pdfUrl = `${item.source}#:~:text=${encodedSearch}`;
+            locationHtml += ` <a href="${pdfUrl}" target="_blank" title="Im PDF öffnen">📄</a>`;
+        }
+
+        row.innerHTML = `
+            <td>${escapeHtml(item.party)} (${item.year})</td>
+            <td>${escapeHtml(item.model)}</td>
+            <td>${escapeHtml(item.category)}</td>
+            <td>${escapeHtml(item.topic)}</td>
+            <td>${escapeHtml(item.quote)}</td>
+            <td>${locationHtml}</td>
+        `;
+        findingsTableBody.appendChild(row);
+    });
+
+    programsContainer.classList.toggle('hidden', results.programs.length === 0);
+    results.programs.forEach(program => {
+        const doc = program.document;
+        const programDiv = document.createElement('div');
+        programDiv.style.marginBottom = '15px';
+
+        const title = document.createElement('h3');
+        title.textContent = `${doc.party} (${doc.year}): ${program.offsets.length} Treffer`;
+        programDiv.appendChild(title);
+
+        const list = document.createElement('ul');
+        program.offsets.slice(0, SNIPPETS_PER_PROGRAM).forEach(offset => {
+            const li = document.createElement('li');
+            li.textContent = '...';
+            list.appendChild(li);
+
+            // Snippets are fetched per hit (Range request on the program text)
+            fetchSnippet(doc, offset)
+                .then(snippet => {
+                    const searchPhrase = `${snippet.before.split(' ').slice(-4).join(' ')}${snippet.hit}`.trim();
+                    const sourceUrl = `${doc.path}#:~:text=${encodeURIComponent(searchPhrase)}`;
+                    li.innerHTML = `...${escapeHtml(snippet.before)}<strong>${escapeHtml(snippet.hit)}</strong>${escapeHtml(snippet.after)}...` +
+                        ` <a href="${sourceUrl}" target="_blank" title="Im Originaltext öffnen">📄</a>`;
+                })
+                .catch(err => {
+                    console.error(err);
+                    li.textContent = 'Textausschnitt konnte nicht geladen werden.';
+                });
+        });
+        programDiv.appendChild(list);
+
+        if (program.offsets.length > SNIPPETS_PER_PROGRAM) {
+            const more = document.createElement('p');
+            more.textContent = `... und ${program.offsets.length - SNIPPETS_PER_PROGRAM} weitere Treffer`;
+            programDiv.appendChild(more);
+        }
+        programsList.appendChild(programDiv);
+    });
+}
+
+function renderModelConsensusMetric(clusteredData, year, selectedModels, filterMode, radius) {
     const container = document.getElementById('model-consensus-metric');
     if (!container) return;
 
     // 1. Identify all models involved in the current view
-    const modelStats = {}; // { modelName: { corroboratedCount: 0, totalFindings: 0 } }
+    const modelStats = {}; // { modelName: { corroboratedCount: 0, totalFindings: 0, baselineCount: 0 } }
+    const hasBaseline = clusteredData.some(party => party.baseline_models && party.baseline_models.length > 0);
 
     clusteredData.forEach(party => {
+        const baseline = party.baseline_findings || [];
         party.items.forEach(cluster => {
             // Get unique models in this cluster
             const uniqueModels = new Set();
             cluster.findings.forEach(f => uniqueModels.add(f.model));
             
             const isCorroborated = uniqueModels.size > 1;
+            // Same overlap rule as the clustering (start < other end and end > other start)
+            const inBaseline = baseline.some(f => f.start < cluster.end && f.end > cluster.start);
             
             uniqueModels.forEach(model => {
                 if (!modelStats[model]) {
-                    modelStats[model] = { corroboratedCount: 0, totalFindings: 0 };
+                    modelStats[model] = { corroboratedCount: 0, totalFindings: 0, baselineCount: 0 };
                 }
                 modelStats[model].totalFindings++;
                 if (isCorroborated) {
                     modelStats[model].corroboratedCount++;
                 }
+                if (inBaseline) {
+                    modelStats[model].baselineCount++;
+                }
             });
         });
     });
@@ -714,23 +747,86 @@ function renderModelConsensusMetric(clusteredData) {
         return;
     }
 
+    // Precision/recall and the agreement matrix are precomputed (scripts/model_agreement.py)
+    // over all models and overlapping quotes, they don't follow the slider or the model selection
+    const agreement = state.globalModelAgreementData;
+    const precomputed = agreement && agreement.modes && agreement.modes[filterMode] && agreement.modes[filterMode][year];
+    const percent = value => (value * 100).toFixed(1) + '%';
+
     container.style.display = 'block';
     let html = '<h3>Modell-Konsens-Metrik</h3>';
-    html += '<p><small>Welches Modell findet am häufigsten Verbote, die auch von mindestens einem anderen Modell gefunden wurden?</small></p>';
+    html += '<p><small>Welches Modell findet am häufigsten Verbote, die auch von mindestens einem anderen Modell gefunden wurden? ';
+    html += `Gesamtfunde: Cluster bei der aktuellen Toleranz (${radius} Zeichen), in denen das Modell vertreten ist. Bestätigt: mindestens ein weiteres ausgewähltes Modell im selben Cluster.`;
+    if (hasBaseline) {
+        html += ' Regelbasiert: Anteil dieser Cluster, die sich mit einem Fund des regelbasierten Referenz-Modells (Signalwörter, zählt nicht als Stimme) überschneiden.';
+    }
+    if (precomputed) {
+        html += ' Präzision und Recall zählen einzelne Funde aller Modelle, die sich mit Funden anderer Modelle überschneiden (unabhängig von Toleranz und Modell-Auswahl): Präzision ist der Anteil der Funde, die auch die Mehrheit der Modelle gefunden hat, Recall der Anteil der Mehrheits-Funde, die das Modell gefunden hat.';
+    }
+    html += '</small></p>';
     html += '<table style="width: 100%; border-collapse: collapse; font-size: 0.9em;">';
-    html += '<thead><tr style="text-align: left; border-bottom: 1px solid #ddd;"><th>Modell</th><th>Bestätigte Funde</th><th>Gesamtfunde</th><th>Quote</th></tr></thead>';
+    html += '<thead><tr style="text-align: left; border-bottom: 1px solid #ddd;"><th>Modell</th><th>Bestätigte Cluster</th><th>Cluster gesamt</th><th>Quote</th>';
+    if (hasBaseline) html += '<th>Regelbasiert</th>';
+    if (precomputed) html += '<th>Präzision</th><th>Recall</th>';
+    html += '</tr></thead>';
     html += '<tbody>';
     
     results.forEach(r => {
         const percentage = (r.ratio * 100).toFixed(1) + '%';
         html += `<tr>
-            <td style="padding: 4px;"><strong>${r.model}</strong></td>
+            <td style="padding: 4px;"><strong>${escapeHtml(r.model)}</strong></td>
             <td style="padding: 4px;">${r.corroboratedCount}</td>
             <td style="padding: 4px;">${r.totalFindings}</td>
-            <td style="padding: 4px;">${percentage}</td>
-        </tr>`;
+            <td style="padding: 4px;">${percentage}</td>`;
+        if (hasBaseline) {
+            html += `<td style="padding: 4px;">${r.totalFindings > 0 ? percent(r.baselineCount / r.totalFindings) : '–'}</td>`;
+        }
+        if (precomputed) {
+            const stats = precomputed.stats[r.model];
+            html += `<td style="padding: 4px;">${stats && stats.findings > 0 ? percent(stats.precision) : '–'}</td>
+            <td style="padding: 4px;">${stats && stats.findings > 0 ? percent(stats.recall) : '–'}</td>`;
+        }
+        html += '</tr>';
     });
     
     html += '</tbody></table>';
+
+    // The baseline doesn't vote, it is scored against the majority of the models
+    if (precomputed && agreement.baseline_models) {
+        agreement.baseline_models.forEach(model => {
+            const stats = precomputed.stats[model];
+            if (!stats || stats.findings === 0) return;
+            html += `<p><small>Regelbasiertes Referenz-Modell (${escapeHtml(model)}): Präzision ${percent(stats.precision)}, Recall ${percent(stats.recall)} gegenüber der Mehrheit der Modelle.</small></p>`;
+        });
+    }
+
+    if (precomputed) {
+        html += renderAgreementMatrix(agreement.models, precomputed, results.map(r => r.model).sort());
+    }
     container.innerHTML = html;
 }
+
+// Pairwise agreement: share of the row model's findings overlapped by the column model
+function renderAgreementMatrix(models, data, shown) {
+    const percent = value => (value * 100).toFixed(1) + '%';
+    let html = '<h4 style="margin-top: 20px;">Übereinstimmung zwischen Modellen</h4>';
+    html += '<p><small>Anteil der Funde des Zeilen-Modells (in Programmen, die beide Modelle analysiert haben), die sich mit einem Fund des Spalten-Modells überschneiden.</small></p>';
+    html += '<table style="width: 100%; border-collapse: collapse; font-size: 0.85em;">';
+    html += '<thead><tr style="text-align: left; border-bottom: 1px solid #ddd;"><th></th>';
+    shown.forEach(m => html += `<th>${escapeHtml(m)}</th>`);
+    html += '</tr></thead><tbody>';
+
+    shown.forEach(rowModel => {
+        const a = models.indexOf(rowModel);
+        html += `<tr><td style="padding: 4px;"><strong>${escapeHtml(rowModel)}</strong></td>`;
+        shown.forEach(colModel => {
+            const b = models.indexOf(colModel);
+            const shared = a >= 0 && b >= 0 ? data.shared[a][b] : 0;
+            const value = shared > 0 ? percent(data.agree[a][b] / shared) : '–';
+            html += `<td style="padding: 4px;">${value}</td>`;
+        });
+        html += '</tr>';
+    });
+    html += '</tbody></table>';
+    return html;
+}
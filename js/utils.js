@@ -1,3 +1,13 @@
+// Content-hashed file names of the static build (scripts/build_site.py).
+// Without a build the files are loaded under their own name, bypassing the cache.
+const assetManifest = typeof document !== 'undefined' ? document.getElementById('asset-manifest') : null;
+const ASSETS = assetManifest ? JSON.parse(assetManifest.textContent) : null;
+
+export function assetUrl(path) {
+    if (!ASSETS) return `${path}?v=${new Date().getTime()}`;
+    return ASSETS[path] || path;
+}
+
 export function escapeHtml(text) {
     if (!text) return '';
     return text
@@ -8,6 +18,20 @@ export function escapeHtml(text) {
         .replace(/'/g, "&#039;");
 }
 
+// Text and context of a located finding (start/end) from the snippet
+// table of its entry in consensus_analysis.json
+export function findingSnippet(partyData, finding, context = 150) {
+    const snippet = partyData.snippets[finding.snippet];
+    const start = finding.start - snippet.start;
+    const end = finding.end - snippet.start;
+    return {
+        before: snippet.text.slice(Math.max(0, start - context), start),
+        hit: snippet.text.slice(start, end),
+        after: snippet.text.slice(end, end + context),
+        section: snippet.section
+    };
+}
+
 export const partyColors = {
     'grüne': '#90EE90', // Light Green
     'cducsu': '#000000', // Black
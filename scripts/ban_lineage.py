@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import struct
+import hashlib
+from collections import Counter
+from generate_config import PARTY_MAPPING, BASELINE_MODELS
+from run_stats import RunStats, parse_stats_args
+
+RESULTS_DIR = 'results'
+OUTPUT_FILE = 'ban_lineage.json'
+
+SHINGLE_SIZE = 5  # Character n-grams of the normalized topic + quote
+NUM_PERM = 64  # MinHash signature length
+BANDS = 16  # LSH bands of NUM_PERM / BANDS rows, candidate threshold ~ (1 / BANDS) ** (BANDS / NUM_PERM) = 0.5
+SIMILARITY_THRESHOLD = 0.5  # Minimum estimated Jaccard similarity to link two findings
+MIN_YEARS = 2  # Only report bans that appear in at least this many election years
+
+HASH_FORMAT = struct.Struct(f'<{NUM_PERM}I')
+
+
+def normalize_text(text):
+    return re.sub(r'[^\w]+', ' ', (text or '').lower()).strip()
+
+
+def shingles(text):
+    text = normalize_text(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    """MinHash signature of a shingle set.
+
+    SHAKE-128 yields NUM_PERM independent 32 bit hashes per shingle in one
+    call, the signature is their column-wise minimum. Deterministic across
+    runs, unlike hash().
+    """
+    if not shingle_set:
+        return None
+    rows = [HASH_FORMAT.unpack(hashlib.shake_128(s.encode('utf-8')).digest(HASH_FORMAT.size)) for s in shingle_set]
+    return tuple(map(min, zip(*rows)))
+
+
+def estimated_similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def load_findings():
+    findings = []
+    analyzed_years = {}  # party -> set(years with results)
+
+    for root, dirs, files in os.walk(RESULTS_DIR):
+        for file in files:
+            if not file.endswith('.json'):
+                continue
+            file_path = os.path.join(root, file)
+            parts = os.path.normpath(file_path).split(os.sep)
+            res_idx = parts.index('results')
+            if len(parts) < res_idx + 4:
+                continue
+            year = parts[res_idx + 1]
+            model = parts[res_idx + 2]
+            party_key = os.path.splitext(parts[res_idx + 3])[0]
+            if model in BASELINE_MODELS:
+                # The reference model only serves as comparison in the consensus view
+                continue
+
+            party = PARTY_MAPPING.get(party_key)
+            if party is None:
+                party = next((v for k, v in PARTY_MAPPING.items() if k.lower() == party_key.lower()), None)
+            if party is None:
+                raise ValueError(f"Unknown party file: {file} (key: {party_key}) in {file_path}")
+
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error decoding {file_path}")
+                continue
+
+            analyzed_years.setdefault(party, set()).add(year)
+            topics = content.get('topics', []) if isinstance(content, dict) else content
+            for item in topics:
+                findings.append({
+                    "party": party,
+                    "year": year,
+                    "model": model,
+                    "topic": item.get('topic', ''),
+                    "quote": item.get('originalQuote', ''),
+                    "category": item.get('category', ''),
+                    "classification": item.get('classification', '')
+                })
+
+    return findings, analyzed_years
+
+
+def find_similar_pairs(findings, signatures):
+    """Candidate pairs via LSH banding, verified by signature similarity.
+
+    Findings only meet in a bucket if one band of their signatures is
+    identical (and they belong to the same party), so the work grows with
+    the number of near duplicates instead of quadratically.
+    """
+    rows = NUM_PERM // BANDS
+    buckets = {}
+    for i, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(BANDS):
+            key = (findings[i]['party'], band, signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(i)
+
+    checked = set()
+    pairs = []
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if estimated_similarity(signatures[pair[0]], signatures[pair[1]]) >= SIMILARITY_THRESHOLD:
+                    pairs.append(pair)
+    return pairs
+
+
+def group_pairs(count, pairs):
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    for i in range(count):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def build_lineage(members, findings, analyzed_years):
+    group = [findings[i] for i in members]
+    party = group[0]['party']
+    years = sorted({f['year'] for f in group})
+    party_years = sorted(analyzed_years[party])
+
+    # Most frequent topic wording represents the ban
+    topic = Counter(f['topic'] for f in group).most_common(1)[0][0]
+    classification = Counter(f['classification'] for f in group).most_common(1)[0][0]
+
+    later_years = [y for y in party_years if y > years[-1]]
+    models_per_year = {}
+    for f in group:
+        models_per_year.setdefault(f['year'], set()).add(f['model'])
+
+    return {
+        "topic": topic,
+        "classification": classification,
+        "first_seen": years[0],
+        "last_seen": years[-1],
+        "years": years,
+        "recurrences": years[1:],
+        "missing_years": [y for y in party_years if years[0] < y < years[-1] and y not in years],
+        "disappeared_in": later_years[0] if later_years else None,
+        "models": {y: sorted(m) for y, m in sorted(models_per_year.items())},
+        "findings": [
+            {"year": f['year'], "model": f['model'], "category": f['category'], "topic": f['topic'], "quote": f['quote']}
+            for f in sorted(group, key=lambda f: (f['year'], f['model']))
+        ]
+    }
+
+
+def generate_lineage(stats=None):
+    if stats is None:
+        stats = RunStats('ban_lineage')
+    stats.start_profile()
+
+    print("Loading findings...")
+    with stats.stage('read_results'):
+        findings, analyzed_years = load_findings()
+
+    print(f"Hashing {len(findings)} findings...")
+    with stats.stage('minhash'):
+        signatures = [minhash(shingles(f"{f['topic']} {f['quote']}")) for f in findings]
+
+    with stats.stage('lsh'):
+        pairs = find_similar_pairs(findings, signatures)
+
+    with stats.stage('group'):
+        groups = group_pairs(len(findings), pairs)
+        lineages = {}
+        for members in groups:
+            if len({findings[i]['year'] for i in members}) < MIN_YEARS:
+                continue
+            lineages.setdefault(findings[members[0]]['party'], []).append(build_lineage(members, findings, analyzed_years))
+
+    result = []
+    for party in sorted(lineages):
+        party_lineages = sorted(lineages[party], key=lambda l: (l['first_seen'], -len(l['years']), l['topic']))
+        result.append({
+            "party": party,
+            "years": sorted(analyzed_years[party]),
+            "total_lineages": len(party_lineages),
+            "lineages": party_lineages
+        })
+
+    with stats.stage('write_output'), open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    total = sum(p['total_lineages'] for p in result)
+    print(f"Found {total} bans spanning {MIN_YEARS}+ years ({len(pairs)} similar pairs). Saved to {OUTPUT_FILE}")
+    stats.write(OUTPUT_FILE)
+
+
+if __name__ == "__main__":
+    args = parse_stats_args("Track bans across election years per party with MinHash/LSH.")
+    generate_lineage(RunStats('ban_lineage', enabled=args.stats, profile=args.profile))
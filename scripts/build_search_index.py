@@ -0,0 +1,204 @@
+# Builds a sharded inverted index of all findings and program texts for the site search (search/):
+#   manifest.json       tokenizer settings, program documents, shard and chunk sizes
+#   shards/<n>.json     terms whose first PREFIX_LENGTH characters hash to shard n, every term maps to
+#                       {"f": finding ids, "p": [[document id, UTF-8 byte offsets...], ...]} (delta encoded)
+#   findings/<n>.json   the findings with id // FINDINGS_PER_CHUNK == n
+# The browser fetches text snippets with Range requests, js/search.js uses the same tokenizer and shard hash.
+# usage: python3 scripts/build_search_index.py [--shards 256]
+
+import argparse
+import json
+import os
+import re
+import shutil
+import unicodedata
+
+from program_catalog import WORKSPACE_ROOT
+from generate_config import PARTY_MAPPING
+from corpus_store import load_corpus_store
+from run_stats import RunStats, add_stats_arguments
+
+CONFIG_FILE = os.path.join(WORKSPACE_ROOT, 'config.json')
+OUTPUT_DIR = os.path.join(WORKSPACE_ROOT, 'search')
+
+INDEX_VERSION = 1
+NUM_SHARDS = 256
+PREFIX_LENGTH = 3
+MIN_TERM_LENGTH = 2
+FINDINGS_PER_CHUNK = 250
+
+# Words hyphenated at line ends ("Feuerwaffen-richtlinie") are indexed as
+# parts and joined, gender forms ("Bürger*innen") split at the asterisk
+TOKEN_PATTERN = re.compile(r"\w+(?:-\w+)*")
+FOLDING = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+# Folded spelling. Negations and modal verbs ("nicht", "kein", "darf",
+# "soll") are ban signal words and therefore stay searchable.
+STOPWORDS = frozenset("""
+    der die das den dem des ein eine einer eines einem einen und oder aber auch als am an auf aus bei bis
+    durch fuer gegen im in ins ist sind sein war wird werden wurde wurden mit nach noch nur ob so um unter
+    ueber von vom vor wie wir zu zum zur sich sie es er ihr ihre ihren ihrer uns unser unsere unserer
+    unseren unserem dass da damit denn doch hat haben hier was wenn wo dies diese dieser dieses diesen innen
+""".split())
+
+
+def fold(word):
+    return unicodedata.normalize('NFC', word).lower().translate(FOLDING)
+
+
+def tokenize(text):
+    """Yield (term, char offset) for every indexable word of text, in order of the offsets."""
+    for match in TOKEN_PATTERN.finditer(text):
+        originals = match.group().split('-')
+        if len(originals) > 1:
+            yield ''.join(fold(original) for original in originals), match.start()
+
+        offset = match.start()
+        # Offsets from the original parts, folding changes the length ("ä" -> "ae")
+        for original in originals:
+            part = fold(original)
+            if len(part) >= MIN_TERM_LENGTH and part not in STOPWORDS:
+                yield part, offset
+            offset += len(original) + 1
+
+
+def shard_for(term, num_shards=NUM_SHARDS):
+    """FNV-1a (32 bit) over the code points of the term prefix."""
+    h = 0x811c9dc5
+    for ch in term[:PREFIX_LENGTH]:
+        h = ((h ^ ord(ch)) * 0x01000193) & 0xffffffff
+    return h % num_shards
+
+
+def delta_encode(values):
+    return [value - (values[i - 1] if i else 0) for i, value in enumerate(values)]
+
+
+def load_findings(config):
+    findings = []
+    for year in sorted(config):
+        for model in sorted(config[year]):
+            for entry in config[year][model]:
+                path = os.path.join(WORKSPACE_ROOT, entry['file'])
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        content = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    print(f"Skipping {entry['file']}: {e}")
+                    continue
+
+                topics = content.get('topics', []) if isinstance(content, dict) else content
+                for item in topics:
+                    findings.append({
+                        "year": year,
+                        "party": entry['party'],
+                        "model": model,
+                        "category": item.get('category', ''),
+                        "topic": item.get('topic', ''),
+                        "quote": item.get('originalQuote', ''),
+                        "location": item.get('location', ''),
+                        "source": entry.get('original_file', '')
+                    })
+    return findings
+
+
+def build_index(num_shards=NUM_SHARDS, output_dir=OUTPUT_DIR, stats=None):
+    if stats is None:
+        stats = RunStats('build_search_index')
+    stats.start_profile()
+
+    if not os.path.exists(CONFIG_FILE):
+        raise FileNotFoundError(f"{CONFIG_FILE} not found, run generate_config.py first")
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    postings = {}  # term -> {"f": [finding ids], "p": {document id: [byte offsets]}}
+
+    with stats.stage('index_findings'):
+        findings = load_findings(config)
+        for finding_id, finding in enumerate(findings):
+            for term in {term for term, _ in tokenize(f"{finding['topic']} {finding['quote']}")}:
+                postings.setdefault(term, {"f": [], "p": {}})["f"].append(finding_id)
+    print(f"Indexed {len(findings)} findings.")
+
+    documents = []
+    with stats.stage('index_programs'):
+        corpus = load_corpus_store()
+        for document in sorted((d for d in corpus.documents if d['primary']), key=lambda d: (d['year'] or '', d['party_key'])):
+            document_id = len(documents)
+            documents.append({
+                "year": document['year'],
+                "party": PARTY_MAPPING.get(document['party_key'], document['party_key']),
+                "path": document['path']
+            })
+
+            text = corpus.text(document)
+            if len(text.encode('utf-8')) != document['size']:
+                print(f"Warning: {document['path']} is not plain UTF-8 without CR/BOM, snippet offsets will be off")
+
+            # Byte offsets, advanced incrementally from token to token
+            byte_offset = 0
+            last = 0
+            for term, start in tokenize(text):
+                byte_offset += len(text[last:start].encode('utf-8'))
+                last = start
+                postings.setdefault(term, {"f": [], "p": {}})["p"].setdefault(document_id, []).append(byte_offset)
+        corpus.close()
+    print(f"Indexed {len(documents)} program texts, {len(postings)} terms.")
+
+    with stats.stage('write_output'):
+        # Start from scratch, a different shard count leaves stale files otherwise
+        if os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+        os.makedirs(os.path.join(output_dir, 'shards'))
+        os.makedirs(os.path.join(output_dir, 'findings'))
+
+        shards = [{} for _ in range(num_shards)]
+        for term in sorted(postings):
+            entry = {}
+            if postings[term]["f"]:
+                entry["f"] = delta_encode(postings[term]["f"])
+            if postings[term]["p"]:
+                entry["p"] = [[document_id] + delta_encode(offsets) for document_id, offsets in sorted(postings[term]["p"].items())]
+            shards[shard_for(term, num_shards)][term] = entry
+
+        # Compact output, the files are loaded by the browser
+        for n, terms in enumerate(shards):
+            with open(os.path.join(output_dir, 'shards', f"{n}.json"), 'w', encoding='utf-8') as f:
+                json.dump(terms, f, ensure_ascii=False, separators=(',', ':'))
+
+        for n in range(0, len(findings), FINDINGS_PER_CHUNK):
+            with open(os.path.join(output_dir, 'findings', f"{n // FINDINGS_PER_CHUNK}.json"), 'w', encoding='utf-8') as f:
+                json.dump(findings[n:n + FINDINGS_PER_CHUNK], f, ensure_ascii=False, separators=(',', ':'))
+
+        manifest = {
+            "version": INDEX_VERSION,
+            "shards": num_shards,
+            "prefixLength": PREFIX_LENGTH,
+            "minTermLength": MIN_TERM_LENGTH,
+            "stopwords": sorted(STOPWORDS),
+            "findingsPerChunk": FINDINGS_PER_CHUNK,
+            "findings": len(findings),
+            "terms": len(postings),
+            "documents": documents
+        }
+        with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"Search index saved to {output_dir} ({num_shards} shards)")
+    stats.write(os.path.join(WORKSPACE_ROOT, 'search_index.json'))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sharded search index of all findings and program texts.")
+    parser.add_argument("--shards", type=int, default=NUM_SHARDS, help="Number of index shards")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="Output folder")
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    build_index(args.shards, args.output, RunStats('build_search_index', enabled=args.stats, profile=args.profile))
+
+
+if __name__ == "__main__":
+    main()
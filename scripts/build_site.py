@@ -0,0 +1,223 @@
+# Builds the static site into dist/ with content-hashed, precompressed assets, so they can be
+# cached forever (Cache-Control: immutable) and repeat visits only fetch index.html:
+#   - JSON is minified before hashing, config.json points to the hashed result files and
+#     search/manifest.json lists the hashed shards and finding chunks in "files"
+#   - index.html gets an import map for the JS modules and the hashed names of the data files
+#     in #asset-manifest (read by assetUrl() in js/utils.js)
+#   - HTML/JSON/JS/CSS files get .gz and .br siblings (brotli, pip install -r requirements.txt)
+# Program texts and PDFs are copied unchanged (the search fetches snippets with Range requests).
+# usage: python3 scripts/build_site.py [--output dist]
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:  # Checked in build(), the .br files are part of the output
+    brotli = None
+
+from program_catalog import WORKSPACE_ROOT
+
+DIST_DIR = os.path.join(WORKSPACE_ROOT, 'dist')
+DATA_FILES = ['colors.json', 'distribution_analysis.json', 'consensus_analysis.json', 'model_agreement.json']
+SEARCH_DIR = 'search'
+JS_DIR = 'js'
+STYLESHEET = 'style.css'
+ENTRY_MODULE = 'js/main.js'
+COPY_DIRS = ['programs/txt', 'programs/pdf']
+COPY_FILES = ['CNAME']
+
+HASH_LENGTH = 10
+COMPRESS_EXTENSIONS = ('.html', '.json', '.js', '.css')
+MIN_COMPRESS_SIZE = 256  # Smaller files don't get precompressed siblings
+
+
+def hashed_name(path, content):
+    base, ext = os.path.splitext(path)
+    return f"{base}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def minify_json(content, path):
+    try:
+        data = json.loads(content)
+    except ValueError:
+        # The frontend skips invalid result files itself, ship them unchanged
+        logging.warning("Invalid JSON in %s, copied as is", path)
+        return content
+    return dump_json(data)
+
+
+def dump_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def inline_json(data):
+    """JSON for a <script> element, "</" would end the element."""
+    return json.dumps(data, ensure_ascii=False).replace('</', '<\\/')
+
+
+def read(path):
+    with open(os.path.join(WORKSPACE_ROOT, path), 'rb') as f:
+        return f.read()
+
+
+class SiteBuilder:
+    def __init__(self, output):
+        self.output = output
+        self.written = []  # Paths (relative to output) of the files to precompress
+
+    def write(self, path, content):
+        target = os.path.join(self.output, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(content)
+        self.written.append(path)
+
+    def write_hashed(self, path, content):
+        name = hashed_name(path, content)
+        self.write(name, content)
+        return name
+
+    def build_results(self, config):
+        """Write the result files referenced by config.json and point the config to their hashed names."""
+        hashed = {}
+        for year_config in config.values():
+            for entries in year_config.values():
+                for entry in entries:
+                    path = entry.get('file')
+                    if not path:
+                        continue
+                    if path not in hashed:
+                        if not os.path.exists(os.path.join(WORKSPACE_ROOT, path)):
+                            logging.warning("Missing result file %s", path)
+                            hashed[path] = path
+                            continue
+                        hashed[path] = self.write_hashed(path, minify_json(read(path), path))
+                    entry['file'] = hashed[path]
+        logging.info("Wrote %d result files", len(hashed))
+
+    def build_search(self):
+        """Write the search index with hashed shard and chunk names, returns the hashed manifest."""
+        manifest_path = f"{SEARCH_DIR}/manifest.json"
+        if not os.path.exists(os.path.join(WORKSPACE_ROOT, manifest_path)):
+            logging.warning("No search index, run scripts/build_search_index.py")
+            return None
+
+        files = {}
+        for folder in ('shards', 'findings'):
+            for file in sorted(os.listdir(os.path.join(WORKSPACE_ROOT, SEARCH_DIR, folder))):
+                path = f"{SEARCH_DIR}/{folder}/{file}"
+                name = self.write_hashed(path, minify_json(read(path), path))
+                files[f"{folder}/{file}"] = os.path.relpath(name, SEARCH_DIR)
+
+        manifest = json.loads(read(manifest_path))
+        manifest['files'] = files
+        logging.info("Wrote search index (%d files)", len(files))
+        return self.write_hashed(manifest_path, dump_json(manifest))
+
+    def build_index_html(self, assets, modules, stylesheet):
+        html = read('index.html').decode('utf-8')
+
+        replacements = {
+            f'href="{STYLESHEET}"': f'href="{stylesheet}"',
+            f'<script type="module" src="{ENTRY_MODULE}">': f'<script type="module" src="{modules[ENTRY_MODULE]}">'
+        }
+        for old, new in replacements.items():
+            if old not in html:
+                raise SystemExit(f"index.html has no {old}, update scripts/build_site.py")
+            html = html.replace(old, new)
+
+        # Keys are resolved against index.html, like the relative imports of the modules
+        import_map = {"imports": {f"./{path}": f"./{name}" for path, name in sorted(modules.items())}}
+        head = (
+            f'    <script type="importmap">{inline_json(import_map)}</script>\n'
+            f'    <script type="application/json" id="asset-manifest">{inline_json(assets)}</script>\n'
+        )
+        html = html.replace('</head>', head + '</head>', 1)
+        self.write('index.html', html.encode('utf-8'))
+
+    def copy_static(self):
+        for path in COPY_DIRS:
+            source = os.path.join(WORKSPACE_ROOT, path)
+            if os.path.isdir(source):
+                shutil.copytree(source, os.path.join(self.output, path))
+        for path in COPY_FILES:
+            if os.path.exists(os.path.join(WORKSPACE_ROOT, path)):
+                shutil.copy2(os.path.join(WORKSPACE_ROOT, path), os.path.join(self.output, path))
+
+    def precompress(self):
+        sizes = {"raw": 0, "gz": 0, "br": 0}
+        for path in self.written:
+            if not path.endswith(COMPRESS_EXTENSIONS):
+                continue
+            target = os.path.join(self.output, path)
+            with open(target, 'rb') as f:
+                content = f.read()
+            sizes['raw'] += len(content)
+            if len(content) < MIN_COMPRESS_SIZE:
+                continue
+
+            variants = {
+                'gz': gzip.compress(content, compresslevel=9, mtime=0),
+                'br': brotli.compress(content, quality=11)
+            }
+            for ext, compressed in variants.items():
+                if len(compressed) < len(content):
+                    with open(f"{target}.{ext}", 'wb') as f:
+                        f.write(compressed)
+                    sizes[ext] += len(compressed)
+        return sizes
+
+    def build(self):
+        if brotli is None:
+            raise SystemExit("brotli is not installed (pip install -r requirements.txt)")
+
+        if os.path.exists(self.output):
+            shutil.rmtree(self.output)
+        os.makedirs(self.output)
+
+        config = json.loads(read('config.json'))
+        self.build_results(config)
+        assets = {'config.json': self.write_hashed('config.json', dump_json(config))}
+
+        for path in DATA_FILES:
+            if not os.path.exists(os.path.join(WORKSPACE_ROOT, path)):
+                logging.warning("Missing %s, the site will fail to load it", path)
+                continue
+            assets[path] = self.write_hashed(path, minify_json(read(path), path))
+
+        search_manifest = self.build_search()
+        if search_manifest:
+            assets[f"{SEARCH_DIR}/manifest.json"] = search_manifest
+
+        modules = {}
+        for file in sorted(os.listdir(os.path.join(WORKSPACE_ROOT, JS_DIR))):
+            if file.endswith('.js'):
+                path = f"{JS_DIR}/{file}"
+                modules[path] = self.write_hashed(path, read(path))
+        stylesheet = self.write_hashed(STYLESHEET, read(STYLESHEET))
+
+        self.build_index_html(assets, modules, stylesheet)
+        self.copy_static()
+
+        sizes = self.precompress()
+        logging.info("Wrote %d files to %s: %.1f MB, gzip %.1f MB, brotli %.1f MB", len(self.written),
+                     os.path.relpath(self.output, WORKSPACE_ROOT), sizes['raw'] / 1e6, sizes['gz'] / 1e6, sizes['br'] / 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static site with content-hashed, precompressed assets.")
+    parser.add_argument("--output", default=DIST_DIR, help="Output folder (replaced on every build)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    SiteBuilder(os.path.abspath(args.output)).build()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 # runs scripts for (re-)calculating the data files
 # usage: ./calc.sh
+# (the python scripts accept --stats / --profile to write timing and match statistics)
 
+python3 scripts/corpus_store.py
+python3 scripts/extract_pdf.py  # needs pypdf (pip install -r requirements.txt)
+python3 scripts/extract_rules.py  # rule-based baseline model (results/<year>/rules)
 python3 scripts/check_distribution.py
 python3 scripts/classify_topics.py
 python3 scripts/generate_config.py
-python3 scripts/generate_consensus.py  
\ No newline at end of file
+python3 scripts/generate_consensus.py
+python3 scripts/model_agreement.py
+python3 scripts/ban_lineage.py
+python3 scripts/build_search_index.py
+python3 scripts/build_site.py  # content-hashed, precompressed site in dist/ (needs brotli)
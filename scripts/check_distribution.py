@@ -1,49 +1,37 @@
 import os
 import json
-import unicodedata
 import difflib
-from generate_config import PARTY_MAPPING
+import time
+from generate_config import PARTY_MAPPING, BASELINE_MODELS
+from corpus_store import load_corpus_store
+from run_stats import RunStats, parse_stats_args, MATCH_OFFSET, MATCH_EXACT, MATCH_WHITESPACE, MATCH_FUZZY, MATCH_NOT_FOUND
 
 RESULTS_DIR = 'results'
-PROGRAMS_DIR = 'programs/txt'
 OUTPUT_FILE = 'distribution_analysis.json'
 
-def normalize_filename(filename):
-    # Normalize to NFC for consistent comparison
-    if not isinstance(filename, str):
-        return ""
-    return unicodedata.normalize('NFC', filename)
-
-def build_file_map(root_dir):
-    file_map = {}
-    for root, dirs, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith('.txt'):
-                # Store both the original and normalized filename
-                norm_name = normalize_filename(file)
-                full_path = os.path.join(root, file)
-                file_map[norm_name] = full_path
-                # Also map without extension for easier lookup
-                name_no_ext = os.path.splitext(norm_name)[0]
-                file_map[name_no_ext] = full_path
-    return file_map
-
 def find_quote_position_fuzzy(text, quote):
+    index, score, _ = locate_quote(text, quote)
+    return index, score
+
+def locate_quote(text, quote):
+    # Same as find_quote_position_fuzzy, but also reports which step matched
     if not quote:
-        return -1, 0
+        return -1, 0, MATCH_NOT_FOUND
     
     # 1. Exact match
     index = text.find(quote)
     if index != -1:
-        return index, 100
+        return index, 100, MATCH_EXACT
     
     # 2. Normalized whitespace match (simple fallback)
     quote_clean = quote.replace('\n', ' ').replace('\r', '')
     index = text.find(quote_clean)
     if index != -1:
-        return index, 95 # Penalty for whitespace mismatch
+        return index, 95, MATCH_WHITESPACE # Penalty for whitespace mismatch
         
     # 3. Fuzzy match using SequenceMatcher
+    # text may be a corpus store view, only this step needs the decoded text
+    text = str(text)
     # Use autojunk=False to speed up for large texts
     s = difflib.SequenceMatcher(None, text, quote, autojunk=False)
     
@@ -78,13 +66,18 @@ def find_quote_position_fuzzy(text, quote):
         
         # If score is too low, it might be a false positive (just a common phrase)
         if score > 60:
-            return start_in_text, score
+            return start_in_text, score, MATCH_FUZZY
             
-    return -1, 0
+    return -1, 0, MATCH_NOT_FOUND
+
+def analyze_distribution(stats=None):
+    if stats is None:
+        stats = RunStats('check_distribution')
+    stats.start_profile()
 
-def analyze_distribution():
-    print("Building source file map...")
-    source_file_map = build_file_map(PROGRAMS_DIR)
+    print("Opening corpus store...")
+    with stats.stage('open_corpus'):
+        corpus = load_corpus_store()
     
     results_data = []
 
@@ -105,6 +98,9 @@ def analyze_distribution():
                 year = parts[res_idx + 1]
                 model = parts[res_idx + 2]
                 party_filename = parts[res_idx + 3]
+                if model in BASELINE_MODELS:
+                    # Reference model with exact offsets, not part of the comparison
+                    continue
                 
                 # Use strict mapping
                 party_key = os.path.splitext(party_filename)[0]
@@ -127,7 +123,7 @@ def analyze_distribution():
                 continue
 
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with stats.stage('read_results'), open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
             except Exception as e:
                 print(f"Error reading {file_path}: {e}")
@@ -138,26 +134,16 @@ def analyze_distribution():
                 # Strict validation
                 raise ValueError(f"Missing sourceFile in {file_path}")
 
-            # Normalize and try to find the file
-            norm_source = normalize_filename(source_filename)
-            
-            # Try exact match
-            source_path = source_file_map.get(norm_source)
-            
-            # If not found, try swapping extension to .txt
-            if not source_path:
-                name_no_ext = os.path.splitext(norm_source)[0]
-                source_path = source_file_map.get(name_no_ext)
+            # Find the text by (normalized) name, with or without extension
+            source_document = corpus.get(source_filename)
 
-            if not source_path:
+            if not source_document:
                 # Strict validation
-                raise FileNotFoundError(f"Source file '{source_filename}' (norm: '{norm_source}') not found for {file_path}")
+                raise FileNotFoundError(f"Source file '{source_filename}' not found for {file_path}")
 
-            try:
-                with open(source_path, 'r', encoding='utf-8') as f:
-                    source_text = f.read()
-            except Exception as e:
-                raise IOError(f"Error reading source {source_path}: {e}")
+            with stats.stage('read_sources'):
+                # Searched in the mmap, decoded only for fuzzy matches
+                source_text = corpus.view(source_document)
 
             total_length = len(source_text)
             if total_length == 0:
@@ -171,7 +157,15 @@ def analyze_distribution():
 
             for topic in topics:
                 quote = topic.get('originalQuote')
-                index, score = find_quote_position_fuzzy(source_text, quote)
+                match_start = time.perf_counter()
+                if isinstance(topic.get('start'), int):
+                    # Rule based findings come with exact offsets
+                    index, score, method = topic['start'], 100, MATCH_OFFSET
+                else:
+                    index, score, method = locate_quote(source_text, quote)
+                match_seconds = time.perf_counter() - match_start
+                stats.record_match(method, match_seconds, model=model, source_file=source_filename, quote=quote)
+                stats.add_stage_time('locate_quotes', match_seconds)
 
                 if index != -1:
                     relative_pos = index / total_length
@@ -197,10 +191,12 @@ def analyze_distribution():
                 "positions": positions
             })
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+    with stats.stage('write_output'), open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(results_data, f, indent=2, ensure_ascii=False)
     
     print(f"Analysis complete. Saved to {OUTPUT_FILE}")
+    stats.write(OUTPUT_FILE)
 
 if __name__ == "__main__":
-    analyze_distribution()
+    args = parse_stats_args("Locate every quote in its source text and write the position distribution.")
+    analyze_distribution(RunStats('check_distribution', enabled=args.stats, profile=args.profile))
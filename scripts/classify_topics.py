@@ -2,6 +2,10 @@ import os
 import json
 import re
 import glob
+from run_stats import RunStats, parse_stats_args
+
+# The classification is written into the result files, stats go to classify_topics_stats.json
+STATS_OUTPUT = 'classify_topics.json'
 
 # Basic German Stopwords
 STOPWORDS = {
@@ -69,7 +73,11 @@ def get_classification(text):
     longest_word = max(meaningful_words, key=len)
     return longest_word.upper()
 
-def process_files():
+def process_files(stats=None):
+    if stats is None:
+        stats = RunStats('classify_topics')
+    stats.start_profile()
+
     base_dir = os.path.join(os.path.dirname(__file__), '..', 'results')
     pattern = os.path.join(base_dir, '**', '*.json')
     
@@ -79,30 +87,34 @@ def process_files():
     
     for file_path in files:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with stats.stage('read_results'), open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                if not content.strip():
-                    continue
-                data = json.loads(content)
+            if not content.strip():
+                continue
+            data = json.loads(content)
             
             if 'topics' not in data:
                 continue
                 
             modified = False
-            for item in data['topics']:
-                if 'topic' in item:
-                    classification = get_classification(item['topic'])
-                    if 'classification' not in item or item['classification'] != classification:
-                        item['classification'] = classification
-                        modified = True
+            with stats.stage('classify'):
+                for item in data['topics']:
+                    if 'topic' in item:
+                        classification = get_classification(item['topic'])
+                        if 'classification' not in item or item['classification'] != classification:
+                            item['classification'] = classification
+                            modified = True
             
             if modified:
-                with open(file_path, 'w', encoding='utf-8') as f:
+                with stats.stage('write_results'), open(file_path, 'w', encoding='utf-8') as f:
                     json.dump(data, f, indent=2, ensure_ascii=False)
                 print(f"Updated {file_path}")
                 
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
 
+    stats.write(STATS_OUTPUT)
+
 if __name__ == "__main__":
-    process_files()
+    args = parse_stats_args("Assign a topic classification to every finding in the result files.")
+    process_files(RunStats('classify_topics', enabled=args.stats, profile=args.profile))
@@ -0,0 +1,86 @@
+def finding_center(finding):
+    return (finding['start'] + finding['end']) / 2
+
+
+def overlap_groups(findings):
+    """Split findings into groups of overlapping quotes.
+
+    Interval index over (start, end): the findings are sorted by start and a
+    finding belongs to the current group as long as it starts before the
+    largest end seen in the group. Every group is a connected component of
+    the overlap graph (start < other end and end > other start), so a quote
+    that overlaps any quote of a group is never split from it, however far
+    apart the starts are. The groups don't overlap each other.
+    """
+    groups = []
+    # sorted() is stable like Array.prototype.sort, ties keep the input order
+    for finding in sorted(findings, key=lambda f: f['start']):
+        if groups and finding['start'] < groups[-1]['end']:
+            group = groups[-1]
+            group['end'] = max(group['end'], finding['end'])
+            group['center_sum'] += finding_center(finding)
+            group['findings'].append(finding)
+        else:
+            groups.append({
+                'start': finding['start'],
+                'end': finding['end'],
+                'center_sum': finding_center(finding),
+                'findings': [finding]
+            })
+    return groups
+
+
+def cluster_findings(findings, tolerance, total_models):
+    """Group located findings into consensus clusters.
+
+    Same rule as the consensus view (js/clustering.js), checked against
+    the shared cases in tests/fixtures/clustering.json:
+
+    - overlapping quotes always end up in one cluster (overlap_groups)
+    - in order of position, a group joins the previous cluster if its mean
+      center ((start + end) / 2 of its findings) is at most tolerance / 2
+      away from the mean center of the cluster, the slider value is the
+      diameter of the Toleranz-Bereich
+
+    The groups don't overlap and are ordered by position, so the clusters
+    don't overlap either. One sort plus two linear sweeps, O(n log n).
+    Returns the clusters ordered by position.
+    """
+    clusters = []
+    current = None
+
+    for group in overlap_groups(findings):
+        count = len(group['findings'])
+        if current is not None:
+            distance = abs(group['center_sum'] / count - current['center_sum'] / len(current['findings']))
+            if distance <= tolerance / 2:
+                current['end'] = max(current['end'], group['end'])
+                current['center_sum'] += group['center_sum']
+                current['findings'].extend(group['findings'])
+                continue
+            clusters.append(finalize_cluster(current, total_models))
+        current = group
+
+    if current is not None:
+        clusters.append(finalize_cluster(current, total_models))
+
+    return clusters
+
+
+def finalize_cluster(cluster, total_models):
+    # The longest quote represents the cluster (the later one on ties, like the reduce() in JS)
+    longest = cluster['findings'][0]
+    for finding in cluster['findings'][1:]:
+        if finding['end'] - finding['start'] >= longest['end'] - longest['start']:
+            longest = finding
+
+    vote_count = len({finding['model'] for finding in cluster['findings']})
+    return {
+        "representative": longest,
+        "start": cluster['start'],
+        "end": cluster['end'],
+        "vote_count": vote_count,
+        "total_models": total_models,
+        "confidence": vote_count / total_models if total_models else 0,
+        "findings": cluster['findings']
+    }
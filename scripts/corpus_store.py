@@ -0,0 +1,268 @@
+# Packs all program texts under programs/txt into one memory-mapped store:
+#   .cache/corpus.bin   all texts, fixed-width UTF-32-LE, back to back
+#   .cache/corpus.json  document table (name, year, party, char offset, length, heading index, size/mtime of the source)
+# Every character takes four bytes, so a character range maps directly to a byte range
+# of the blob: quotes are searched and snippets sliced in the mmap without decoding
+# whole documents, and the heading index (sections) is computed once when the store is built.
+# usage: python3 scripts/corpus_store.py [--force]
+# (scripts call load_corpus_store(), which rebuilds the store when a program text changed)
+
+import re
+import json
+import mmap
+import bisect
+import argparse
+import os
+
+from program_catalog import WORKSPACE_ROOT, PROGRAMS_DIR, normalize_filename, party_key_for_source, find_programs
+
+STORE_DIR = os.path.join(WORKSPACE_ROOT, '.cache')
+BLOB_FILE = os.path.join(STORE_DIR, 'corpus.bin')
+TABLE_FILE = os.path.join(STORE_DIR, 'corpus.json')
+
+ENCODING = 'utf-32-le'
+CHAR_WIDTH = 4
+STORE_VERSION = 2
+
+# Short lines without sentence punctuation (apart from a "3.4." style
+# numbering) are treated as chapter headings
+HEADING_PATTERN = re.compile(r"^[ \t]*((?:\d+\.)*[ \t]*[^\n.!?;,:]{3,90}?)[ \t]*$", re.MULTILINE)
+
+
+def build_heading_index(text):
+    offsets = []
+    titles = []
+    for match in HEADING_PATTERN.finditer(text):
+        offsets.append(match.start(1))
+        titles.append(match.group(1).strip())
+    return offsets, titles
+
+
+def find_heading(heading_index, position):
+    offsets, titles = heading_index
+    i = bisect.bisect_right(offsets, position) - 1
+    return titles[i] if i >= 0 else ""
+
+
+def _source_files(programs_dir):
+    paths = []
+    for root, dirs, files in os.walk(programs_dir):
+        for file in files:
+            if file.endswith('.txt'):
+                paths.append(os.path.abspath(os.path.join(root, file)))
+    return sorted(paths)
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_store(programs_dir=PROGRAMS_DIR, blob_file=BLOB_FILE, table_file=TABLE_FILE):
+    os.makedirs(os.path.dirname(blob_file), exist_ok=True)
+
+    # The catalog decides which text represents a (year, party)
+    primary = {os.path.abspath(p['path']) for p in find_programs(programs_dir)}
+    programs_dir = os.path.abspath(programs_dir)
+
+    documents = []
+    offset = 0
+    # Per process temp files, several scripts may build the store at the same time
+    tmp_blob = f"{blob_file}.{os.getpid()}.tmp"
+    with open(tmp_blob, 'wb') as blob:
+        for path in _source_files(programs_dir):
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            blob.write(text.encode(ENCODING))
+
+            rel_path = os.path.relpath(path, programs_dir)
+            year = rel_path.split(os.sep)[0]
+            heading_offsets, heading_titles = build_heading_index(text)
+            documents.append({
+                "name": normalize_filename(os.path.basename(path)),
+                "path": os.path.relpath(path, WORKSPACE_ROOT),
+                "year": year if year.isdigit() else None,
+                "party_key": party_key_for_source(path),
+                "primary": path in primary,
+                "offset": offset,
+                "length": len(text),
+                "heading_offsets": heading_offsets,
+                "heading_titles": heading_titles,
+                **_source_signature(path)
+            })
+            offset += len(text)
+
+    table = {"version": STORE_VERSION, "encoding": ENCODING, "programs_dir": os.path.relpath(programs_dir, WORKSPACE_ROOT), "documents": documents}
+    tmp_table = f"{table_file}.{os.getpid()}.tmp"
+    with open(tmp_table, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False)
+
+    os.replace(tmp_blob, blob_file)
+    os.replace(tmp_table, table_file)
+    return table
+
+
+def is_stale(programs_dir=PROGRAMS_DIR, blob_file=BLOB_FILE, table_file=TABLE_FILE):
+    if not os.path.exists(blob_file) or not os.path.exists(table_file):
+        return True
+    with open(table_file, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if table.get("version") != STORE_VERSION:
+        return True
+
+    known = {os.path.abspath(os.path.join(WORKSPACE_ROOT, d["path"])): d for d in table["documents"]}
+    current = _source_files(programs_dir)
+    if set(current) != set(known):
+        return True
+    for path in current:
+        document = known[path]
+        signature = _source_signature(path)
+        if signature["size"] != document["size"] or signature["mtime_ns"] != document["mtime_ns"]:
+            return True
+    return False
+
+
+class DocumentText:
+    """str-like view on one document for the quote locators.
+
+    find(), len() and slices read the mmap, only str() decodes the whole
+    text (once, for the fuzzy difflib step).
+    """
+
+    def __init__(self, store, document):
+        self.store = store
+        self.document = document
+        self._text = None
+
+    def __len__(self):
+        return self.document["length"]
+
+    def find(self, needle, start=0, end=None):
+        return self.store.find(self.document, needle, start, end)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.store.text(self.document, key.start or 0, key.stop)
+        return self.store.text(self.document, key, key + 1)
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self.store.text(self.document)
+        return self._text
+
+
+class CorpusStore:
+    """Read-only view on the packed program texts.
+
+    Documents are the dicts of the document table, offsets are character
+    offsets within a document.
+    """
+
+    def __init__(self, blob_file=BLOB_FILE, table_file=TABLE_FILE):
+        with open(table_file, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+        self.documents = table["documents"]
+
+        self._file = open(blob_file, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._mmap) if self._mmap else memoryview(b'')
+
+        self._by_name = {}
+        self._by_party = {}
+        for document in self.documents:
+            self._by_name[document["name"]] = document
+            self._by_name.setdefault(os.path.splitext(document["name"])[0], document)
+            if document["primary"]:
+                self._by_party[(document["year"], document["party_key"])] = document
+
+    def close(self):
+        self._view.release()
+        if self._mmap:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, source_file):
+        """Look up a document by file name, with or without extension (e.g. sourceFile of a result)."""
+        name = normalize_filename(os.path.basename(source_file or ''))
+        return self._by_name.get(name) or self._by_name.get(os.path.splitext(name)[0])
+
+    def by_party(self, year, party_key):
+        return self._by_party.get((year, party_key))
+
+    def view(self, document):
+        return DocumentText(self, document)
+
+    def headings(self, document):
+        """Heading index of a document for find_heading()."""
+        return document["heading_offsets"], document["heading_titles"]
+
+    def section(self, document, position):
+        return find_heading(self.headings(document), position)
+
+    def _byte_range(self, document, start, end):
+        length = document["length"]
+        start = min(max(start, 0), length)
+        end = length if end is None else min(max(end, start), length)
+        base = document["offset"] * CHAR_WIDTH
+        return base + start * CHAR_WIDTH, base + end * CHAR_WIDTH
+
+    def text(self, document, start=0, end=None):
+        """Decode a character range of a document (the whole text by default)."""
+        byte_start, byte_end = self._byte_range(document, start, end)
+        return str(self._view[byte_start:byte_end], ENCODING)
+
+    def find(self, document, needle, start=0, end=None):
+        """str.find() on a document without decoding it. Returns a character offset or -1."""
+        if not needle or not self._mmap:
+            return -1
+        pattern = needle.encode(ENCODING)
+        byte_start, byte_end = self._byte_range(document, start, end)
+        base = document["offset"] * CHAR_WIDTH
+
+        # UTF-32-LE patterns end in zero bytes, which defeat the skip table of
+        # mmap.find (about 10x slower), so search without them and compare the
+        # full pattern at the candidates
+        probe = pattern.rstrip(b'\0') or pattern
+        index = self._mmap.find(probe, byte_start, byte_end)
+        while index != -1:
+            if index + len(pattern) > byte_end:
+                return -1
+            if (index - base) % CHAR_WIDTH == 0 and self._mmap[index:index + len(pattern)] == pattern:
+                return (index - base) // CHAR_WIDTH
+            # Matched across character boundaries or only the probe, keep looking
+            index = self._mmap.find(probe, index + 1, byte_end)
+        return -1
+
+
+def load_corpus_store(programs_dir=PROGRAMS_DIR):
+    """Open the corpus store, (re-)building it first if program texts changed."""
+    if is_stale(programs_dir):
+        print("Building corpus store...")
+        build_store(programs_dir)
+    return CorpusStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack all program texts into one memory-mapped corpus store.")
+    parser.add_argument("--programs", default=PROGRAMS_DIR, help="Program texts root folder")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the store is up to date")
+    args = parser.parse_args()
+
+    if not args.force and not is_stale(args.programs):
+        print(f"Corpus store is up to date ({BLOB_FILE})")
+        return
+
+    table = build_store(args.programs)
+    total = sum(d["length"] for d in table["documents"])
+    print(f"Packed {len(table['documents'])} documents ({total} characters) into {BLOB_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# Runs the ban extraction prompt (PROMPT.md) against an OpenAI-compatible chat
+# completions endpoint for every program text and writes results/<year>/<name>/<party>.json.
+# Answers are cached in .cache/extract, so interrupted runs only request missing chunks.
+# usage: python3 scripts/extract_bans.py --endpoint http://localhost:8000/v1 --model qwen3 [--name qwen]
+# (offline: start scripts/mock_llm_server.py and use it as endpoint)
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from classify_topics import get_classification
+from program_catalog import WORKSPACE_ROOT, find_programs
+
+PROMPT_FILE = os.path.join(WORKSPACE_ROOT, 'PROMPT.md')
+RESULTS_DIR = os.path.join(WORKSPACE_ROOT, 'results')
+CACHE_DIR = os.path.join(WORKSPACE_ROOT, '.cache', 'extract')
+
+RESULT_FIELDS = ["category", "topic", "location", "originalQuote"]
+RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class RequestError(Exception):
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Spaces out requests so that at most `per_minute` start every minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def chunk_text(text, chunk_size, overlap=0, search_range=5000):
+    """Split text into chunks of roughly chunk_size characters.
+
+    Like split_text.py, the cut is moved to the nearest paragraph break
+    (or line break) before the limit. Returns (offset, chunk) pairs.
+    """
+    if chunk_size <= 0 or len(text) <= chunk_size:
+        return [(0, text)]
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        if end >= len(text):
+            chunks.append((start, text[start:]))
+            break
+
+        floor = max(start + 1, end - search_range)
+        split_index = text.rfind('\n\n', floor, end)
+        if split_index != -1:
+            split_index += 2
+        else:
+            split_index = text.rfind('\n', floor, end)
+            split_index = split_index + 1 if split_index != -1 else end
+
+        chunks.append((start, text[start:split_index]))
+        start = max(split_index - overlap, start + 1) if overlap else split_index
+    return chunks
+
+
+def sha256(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def cache_key(model, prompt_hash, chunk_hash):
+    return sha256(f"{model}\n{prompt_hash}\n{chunk_hash}")
+
+
+def parse_response_content(content):
+    """Extract the topics list from a model answer.
+
+    Models tend to wrap the JSON in code fences or add text around it, so
+    everything between the first '{' and the last '}' is parsed.
+    """
+    start = content.find('{')
+    end = content.rfind('}')
+    if start == -1 or end == -1:
+        raise ValueError("No JSON object in response")
+    data = json.loads(content[start:end + 1])
+    topics = data.get('topics', []) if isinstance(data, dict) else []
+
+    result = []
+    for topic in topics:
+        if not isinstance(topic, dict) or not topic.get('originalQuote'):
+            continue
+        result.append({field: str(topic.get(field, '')) for field in RESULT_FIELDS})
+    return result
+
+
+class ExtractionClient:
+    def __init__(self, endpoint, api_key, model, concurrency, rate_limit, retries, timeout, cache_dir, temperature=0.0):
+        self.endpoint = endpoint.rstrip('/')
+        self.api_key = api_key
+        self.model = model
+        self.retries = retries
+        self.timeout = timeout
+        self.temperature = temperature
+        self.cache_dir = Path(cache_dir)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rate_limit)
+        self.requests = 0
+        self.cache_hits = 0
+
+    def _post(self, payload):
+        # Runs in a worker thread, urllib is blocking
+        url = f"{self.endpoint}/chat/completions"
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'), headers=headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            retry_after = e.headers.get('Retry-After') if e.headers else None
+            raise RequestError(f"HTTP {e.code} from {url}", retryable=e.code in RETRY_STATUS,
+                               retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise RequestError(f"Request to {url} failed: {e}", retryable=True)
+
+    async def complete(self, prompt, chunk, source_file):
+        payload = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": f"Dateiname: {source_file}\n\n{chunk}"}
+            ]
+        }
+
+        for attempt in range(self.retries + 1):
+            async with self.semaphore:
+                await self.limiter.wait()
+                try:
+                    self.requests += 1
+                    response = await asyncio.to_thread(self._post, payload)
+                    return response["choices"][0]["message"]["content"]
+                except RequestError as e:
+                    if not e.retryable or attempt == self.retries:
+                        raise
+                    delay = e.retry_after or min(60.0, 2 ** attempt) + random.uniform(0, 1)
+                    logging.warning("%s, retrying in %.1fs (attempt %d/%d)", e, delay, attempt + 1, self.retries)
+            # Sleep outside the semaphore so other chunks can proceed
+            await asyncio.sleep(delay)
+
+    async def extract_chunk(self, prompt, prompt_hash, chunk, source_file):
+        key = cache_key(self.model, prompt_hash, sha256(chunk))
+        cache_file = self.cache_dir / f"{key}.json"
+        if cache_file.exists():
+            self.cache_hits += 1
+            content = json.loads(cache_file.read_text(encoding='utf-8'))["content"]
+            return parse_response_content(content)
+
+        content = await self.complete(prompt, chunk, source_file)
+        topics = parse_response_content(content)  # Only cache answers we can parse
+
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps({"model": self.model, "content": content}, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_file, cache_file)
+        return topics
+
+
+async def extract_program(client, program, prompt, prompt_hash, output_path, chunk_size, overlap):
+    text = Path(program["path"]).read_text(encoding='utf-8')
+    chunks = chunk_text(text, chunk_size, overlap)
+    logging.info("%s %s: %d chunk(s)", program["year"], program["party_key"], len(chunks))
+
+    chunk_results = await asyncio.gather(*[
+        client.extract_chunk(prompt, prompt_hash, chunk, program["sourceFile"]) for _, chunk in chunks
+    ])
+
+    # Merge in document order, overlapping chunks can report the same quote twice
+    topics = []
+    seen_quotes = set()
+    for chunk_topics in chunk_results:
+        for topic in chunk_topics:
+            if topic["originalQuote"] in seen_quotes:
+                continue
+            seen_quotes.add(topic["originalQuote"])
+            topic["classification"] = get_classification(topic["topic"])
+            topics.append(topic)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"sourceFile": program["sourceFile"], "topics": topics}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+    logging.info("Wrote %s (%d topics)", output_path, len(topics))
+
+
+async def run(args):
+    prompt = Path(args.prompt).read_text(encoding='utf-8').strip()
+    prompt_hash = sha256(prompt)
+    name = args.name or args.model
+
+    programs = find_programs(args.programs, years=args.years, parties=args.parties)
+    logging.info("Found %d programs", len(programs))
+
+    client = ExtractionClient(
+        endpoint=args.endpoint,
+        api_key=args.api_key,
+        model=args.model,
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+        retries=args.retries,
+        timeout=args.timeout,
+        cache_dir=args.cache_dir
+    )
+
+    tasks = []
+    for program in programs:
+        output_path = Path(args.results) / program["year"] / name / f"{program['party_key']}.json"
+        if output_path.exists() and not args.overwrite:
+            logging.info("Skipping existing file %s (use --overwrite to force)", output_path)
+            continue
+        tasks.append(extract_program(client, program, prompt, prompt_hash, output_path, args.chunk_size, args.chunk_overlap))
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    for error in failed:
+        logging.error("Extraction failed: %s", error)
+
+    logging.info("Done: %d programs, %d requests, %d cache hits, %d failed",
+                 len(tasks), client.requests, client.cache_hits, len(failed))
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract bans from all program texts via an OpenAI-compatible endpoint.")
+    parser.add_argument("--endpoint", default=os.environ.get("OPENAI_BASE_URL", "http://localhost:8000/v1"), help="Base URL of the API (…/v1)")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"), help="API key, defaults to $OPENAI_API_KEY")
+    parser.add_argument("--model", required=True, help="Model name sent to the endpoint")
+    parser.add_argument("--name", help="Folder name below results/<year>/, defaults to --model")
+    parser.add_argument("--years", nargs="+", help="Only process these years")
+    parser.add_argument("--parties", nargs="+", help="Only process these party keys (e.g. spd cducsu grüne)")
+    parser.add_argument("--prompt", default=PROMPT_FILE, help="Prompt file")
+    parser.add_argument("--programs", default=os.path.join(WORKSPACE_ROOT, 'programs', 'txt'), help="Program texts root folder")
+    parser.add_argument("--results", default=RESULTS_DIR, help="Results root folder")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Response cache folder")
+    parser.add_argument("--chunk-size", type=int, default=60000, help="Maximum characters per request")
+    parser.add_argument("--chunk-overlap", type=int, default=0, help="Characters repeated between consecutive chunks")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of requests in flight")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Maximum requests per minute (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=5, help="Retries per request on timeouts, 429 and 5xx")
+    parser.add_argument("--timeout", type=float, default=600, help="Request timeout in seconds")
+    parser.add_argument("--overwrite", action="store_true", help="Re-extract programs that already have a result file")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s: %(message)s")
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
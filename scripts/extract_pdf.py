@@ -0,0 +1,273 @@
+# Extracts the program PDFs page by page (process pool, pypdf from requirements.txt)
+# and maps their pages onto the program texts. The page text is cached in .cache/pdf/<sha256>.txt/.json.
+# The TXT files are cleaned versions of the PDFs (no page headers or line numbers), so every page is
+# aligned to its TXT by letter anchors that occur once in the TXT. The page starts (character offsets
+# in the TXT) go to pdf_pages.json, page_for_offset() turns a located quote into a page number.
+# usage: python3 scripts/extract_pdf.py [--workers 4] [--force]
+
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from program_catalog import WORKSPACE_ROOT, normalize_filename
+from corpus_store import load_corpus_store
+
+PDF_DIR = os.path.join(WORKSPACE_ROOT, 'programs', 'pdf')
+CACHE_DIR = os.path.join(WORKSPACE_ROOT, '.cache', 'pdf')
+OUTPUT_FILE = os.path.join(WORKSPACE_ROOT, 'pdf_pages.json')
+
+PAGES_PER_TASK = 16
+ANCHOR_LETTERS = 40  # Letters of an alignment anchor
+ANCHOR_STEP = 20  # Distance of the anchors tried on a page
+ANCHORS_PER_PAGE = 5  # Unique anchors whose median places a page
+
+# Letters only: spacing, line numbers and page numbers differ between PDF and TXT
+LETTER_PATTERN = re.compile(r"[^\W\d_]+")
+
+_readers = {}  # Per worker process: PDF path -> PdfReader
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _open_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise SystemExit("pypdf is not installed (pip install -r requirements.txt)")
+
+    # pypdf logs a warning for every font it can't fully decode
+    logging.getLogger('pypdf').setLevel(logging.ERROR)
+    if path not in _readers:
+        _readers[path] = PdfReader(path)
+    return _readers[path]
+
+
+def count_pages(path):
+    return len(_open_pdf(path).pages)
+
+
+def extract_pages(path, first, last):
+    """Text of the pages first..last-1 (runs in a worker process)."""
+    reader = _open_pdf(path)
+    return [reader.pages[i].extract_text() or '' for i in range(first, last)]
+
+
+def cache_paths(sha):
+    return os.path.join(CACHE_DIR, f"{sha}.txt"), os.path.join(CACHE_DIR, f"{sha}.json")
+
+
+def load_cached_pages(sha):
+    text_file, table_file = cache_paths(sha)
+    if not os.path.exists(text_file) or not os.path.exists(table_file):
+        return None
+    with open(text_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(table_file, 'r', encoding='utf-8') as f:
+        starts = json.load(f)['page_starts']
+    return [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+
+def write_cached_pages(sha, pdf_path, pages):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    text_file, table_file = cache_paths(sha)
+    starts = []
+    offset = 0
+    for page in pages:
+        starts.append(offset)
+        offset += len(page)
+
+    with open(text_file, 'w', encoding='utf-8') as f:
+        f.write(''.join(pages))
+    with open(table_file, 'w', encoding='utf-8') as f:
+        json.dump({"pdf": os.path.relpath(pdf_path, WORKSPACE_ROOT), "pages": len(pages), "page_starts": starts}, f, indent=2, ensure_ascii=False)
+
+
+def extract_all(shas, workers=None, force=False):
+    """Pages of every PDF (path -> SHA-256), from the cache or extracted on a process pool."""
+    pages_by_path = {}
+    todo = []
+    for path, sha in shas.items():
+        cached = None if force else load_cached_pages(sha)
+        if cached is not None:
+            logging.info("Cached %s (%d pages)", os.path.relpath(path, WORKSPACE_ROOT), len(cached))
+            pages_by_path[path] = cached
+        else:
+            todo.append(path)
+
+    if not todo:
+        return pages_by_path
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = dict(zip(todo, pool.map(count_pages, todo)))
+        tasks = [(path, first, min(first + PAGES_PER_TASK, counts[path]))
+                 for path in todo for first in range(0, counts[path], PAGES_PER_TASK)]
+        results = pool.map(extract_pages, *zip(*tasks)) if tasks else []
+
+        for path in todo:
+            pages_by_path[path] = []
+        for (path, first, last), pages in zip(tasks, results):
+            pages_by_path[path].extend(pages)
+
+    for path in todo:
+        write_cached_pages(shas[path], path, pages_by_path[path])
+        logging.info("Extracted %s (%d pages)", os.path.relpath(path, WORKSPACE_ROOT), len(pages_by_path[path]))
+    return pages_by_path
+
+
+def letters(text):
+    """Lower case letters of text (NFKC, so ligatures match) and their character offsets."""
+    chars = []
+    offsets = []
+    for match in LETTER_PATTERN.finditer(text):
+        for ch in unicodedata.normalize('NFKC', match.group()).lower():
+            chars.append(ch)
+            offsets.append(match.start())
+    return ''.join(chars), offsets
+
+
+def page_estimate(page, text_letters):
+    """Letter index in the TXT at which page starts, from anchors that occur exactly once."""
+    page_letters, _ = letters(page)
+    estimates = []
+    for i in range(0, len(page_letters) - ANCHOR_LETTERS + 1, ANCHOR_STEP):
+        anchor = page_letters[i:i + ANCHOR_LETTERS]
+        index = text_letters.find(anchor)
+        if index != -1 and text_letters.find(anchor, index + 1) == -1:
+            # Letters of the page before the anchor belong to the page as well
+            estimates.append(max(0, index - i))
+            if len(estimates) == ANCHORS_PER_PAGE:
+                break
+    if not estimates:
+        return None
+    return sorted(estimates)[len(estimates) // 2]
+
+
+def longest_ordered_run(values):
+    """Indices of the longest non-decreasing subsequence of the values that are not None."""
+    tails = []  # tails[k]: index of the smallest last value of a run of length k + 1
+    tail_values = []  # tail_values[k] == values[tails[k]], kept sorted for bisect
+    previous = {}
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        k = bisect.bisect_right(tail_values, value)
+        previous[i] = tails[k - 1] if k else None
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+
+    run = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        run.add(i)
+        i = previous[i]
+    return run
+
+
+def align_pages(pages, text):
+    """Character offset in text at which every PDF page starts.
+
+    PDF and TXT are compared on their letters only, the extraction adds
+    spaces inside words for some fonts and the TXT has no line numbers.
+    Pages whose position is out of order (mostly tables of contents, which
+    repeat headings of later pages) are dropped. Returns the page starts and
+    the number of anchored pages, pages without an anchor (images, blank
+    pages) start where the next anchored page starts.
+    """
+    text_letters, offsets = letters(text)
+    estimates = [page_estimate(page, text_letters) for page in pages]
+    ordered = longest_ordered_run(estimates)
+
+    starts = [None] * len(pages)
+    for i in ordered:
+        starts[i] = offsets[estimates[i]] if estimates[i] < len(offsets) else len(text)
+
+    following = len(text)
+    for page_number in range(len(pages) - 1, -1, -1):
+        if starts[page_number] is None:
+            starts[page_number] = following
+        following = starts[page_number]
+    # The first page covers everything before the first anchor
+    if starts:
+        starts[0] = 0
+    return starts, len(ordered)
+
+
+def load_page_tables(path=OUTPUT_FILE):
+    """TXT path (relative to the workspace) -> page table entry of pdf_pages.json, {} if not built."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def page_for_offset(page_table, offset):
+    """1-based PDF page of a character offset in the TXT, None without a page table."""
+    if not page_table or offset < 0:
+        return None
+    return bisect.bisect_right(page_table['page_starts'], offset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the program PDFs page by page and map their pages onto the program texts.")
+    parser.add_argument("--pdfs", default=PDF_DIR, help="PDF root folder")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--force", action="store_true", help="Extract again even if the PDF is cached")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s: %(message)s")
+
+    pdf_paths = sorted(
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(args.pdfs)
+        for file in files if file.lower().endswith('.pdf')
+    )
+    logging.info("Found %d PDFs under %s", len(pdf_paths), args.pdfs)
+
+    shas = {path: file_sha256(path) for path in pdf_paths}
+    pages_by_path = extract_all(shas, workers=args.workers, force=args.force)
+
+    corpus = load_corpus_store()
+    tables = {}
+    for path in pdf_paths:
+        document = corpus.get(normalize_filename(os.path.basename(path)))
+        if document is None:
+            logging.warning("No program text for %s", os.path.relpath(path, WORKSPACE_ROOT))
+            continue
+
+        pages = pages_by_path[path]
+        starts, aligned = align_pages(pages, corpus.text(document))
+        if aligned < len(pages) / 2:
+            logging.warning("Only %d of %d pages of %s could be aligned", aligned, len(pages), document['name'])
+        tables[document['path']] = {
+            "pdf": os.path.relpath(path, WORKSPACE_ROOT),
+            "sha256": shas[path],
+            "pages": len(pages),
+            "aligned_pages": aligned,
+            "page_starts": starts
+        }
+    corpus.close()
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(tables, f, indent=2, ensure_ascii=False)
+    logging.info("Wrote page tables of %d programs to %s", len(tables), os.path.relpath(OUTPUT_FILE, WORKSPACE_ROOT))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import os
+import re
+import json
+import bisect
+import argparse
+from classify_topics import get_classification
+from program_catalog import WORKSPACE_ROOT, find_programs
+from corpus_store import load_corpus_store, find_heading
+from run_stats import RunStats, add_stats_arguments
+
+RESULTS_DIR = os.path.join(WORKSPACE_ROOT, 'results')
+MODEL_NAME = 'rules'
+
+EXPLICIT = "explizites Verbot"
+SEMANTIC = "semantisches Verbot"
+
+# Signal phrases from PROMPT.md (plus their common inflections).
+# A phrase must not cross a sentence end, hence [^.!?\n] for gaps.
+EXPLICIT_PHRASES = [
+    r"verboten",
+    r"verbiete[nt]?",
+    r"verbot(?:e|s|en)?",
+    r"untersag(?:t|en|e)",
+    r"dürfen\s+nicht",
+    r"darf\s+nicht(?!\s+weiter)",
+]
+SEMANTIC_PHRASES = [
+    r"keine[nrs]?\s+neuen?",
+    r"nicht\s+(?:mehr\s+)?zulässig",
+    r"unzulässig",
+    r"(?:wird|werden)\s+verhindert",
+    r"verhindern",
+    r"soll(?:en)?\s+unterbleiben",
+    r"lehnen\s+[^.!?\n]{0,150}?\bab",
+    r"(?:wollen|werden)\s+[^.!?\n]{0,150}?\bstoppen",
+    r"darf\s+nicht\s+weiter",
+    r"(?:ist|sind)\s+auszuschließen",
+    r"schließen\s+[^.!?\n]{0,100}?\baus",
+]
+
+BAN_PATTERN = re.compile(
+    r"\b(?:(?P<explicit>" + "|".join(EXPLICIT_PHRASES) + r")|(?P<semantic>" + "|".join(SEMANTIC_PHRASES) + r"))\b",
+    re.IGNORECASE
+)
+SENTENCE_END_PATTERN = re.compile(r"[.!?](?=\s)|\n")
+
+QUOTE_LENGTH = 100
+TOPIC_LENGTH = 80
+
+
+def build_sentence_index(text):
+    return [match.end() for match in SENTENCE_END_PATTERN.finditer(text)]
+
+
+def sentence_bounds(text, sentence_index, start, end):
+    i = bisect.bisect_right(sentence_index, start)
+    sentence_start = sentence_index[i - 1] if i > 0 else 0
+    j = bisect.bisect_left(sentence_index, end)
+    sentence_end = sentence_index[j] if j < len(sentence_index) else len(text)
+
+    # Strip surrounding whitespace so the offsets point at the first/last character
+    while sentence_start < sentence_end and text[sentence_start].isspace():
+        sentence_start += 1
+    while sentence_end > sentence_start and text[sentence_end - 1].isspace():
+        sentence_end -= 1
+    return sentence_start, sentence_end
+
+
+def shorten(text, length):
+    if len(text) <= length:
+        return text
+    cut = text.rfind(' ', 0, length)
+    return text[:cut if cut > 0 else length]
+
+
+def extract_bans(text, heading_index):
+    """Return all sentences of text that contain a ban signal phrase.
+
+    Every sentence is reported once, as explicit ban if any explicit
+    phrase occurs in it. Offsets (start, end) cover the whole sentence,
+    the location is the heading (corpus store heading index) before it.
+    """
+    sentence_index = build_sentence_index(text)
+    sentences = {}
+    order = []
+
+    for match in BAN_PATTERN.finditer(text):
+        start, end = sentence_bounds(text, sentence_index, match.start(), match.end())
+        category = EXPLICIT if match.group('explicit') else SEMANTIC
+        if start in sentences:
+            if category == EXPLICIT:
+                sentences[start]['category'] = EXPLICIT
+            continue
+
+        sentence = re.sub(r'\s+', ' ', text[start:end])
+        sentences[start] = {
+            "category": category,
+            "topic": shorten(sentence, TOPIC_LENGTH),
+            "location": find_heading(heading_index, start),
+            "originalQuote": text[start:start + QUOTE_LENGTH],
+            "classification": get_classification(sentence),
+            "start": start,
+            "end": end
+        }
+        order.append(start)
+
+    return [sentences[start] for start in order]
+
+
+def extract_corpus(results_dir=RESULTS_DIR, model_name=MODEL_NAME, years=None, parties=None, stats=None):
+    if stats is None:
+        stats = RunStats('extract_rules')
+    stats.start_profile()
+
+    with stats.stage('open_corpus'):
+        corpus = load_corpus_store()
+        programs = find_programs(years=years, parties=parties)
+    print(f"Found {len(programs)} programs.")
+
+    total = 0
+    for program in programs:
+        document = corpus.by_party(program['year'], program['party_key'])
+        with stats.stage('read_sources'):
+            # The signal phrase scan runs over the whole text
+            text = corpus.text(document)
+
+        with stats.stage('extract'):
+            topics = extract_bans(text, corpus.headings(document))
+        total += len(topics)
+
+        output_path = os.path.join(results_dir, program['year'], model_name, f"{program['party_key']}.json")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with stats.stage('write_results'), open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"sourceFile": program['sourceFile'], "topics": topics}, f, indent=2, ensure_ascii=False)
+
+    print(f"Extracted {total} bans from {len(programs)} programs into {results_dir}/<year>/{model_name}/")
+    stats.write(os.path.join(WORKSPACE_ROOT, 'rules_extraction.json'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract bans from all program texts with the signal phrases of PROMPT.md.")
+    parser.add_argument("--years", nargs="+", help="Only process these years")
+    parser.add_argument("--parties", nargs="+", help="Only process these party keys (e.g. spd cducsu grüne)")
+    parser.add_argument("--name", default=MODEL_NAME, help="Folder name below results/<year>/")
+    parser.add_argument("--results", default=RESULTS_DIR, help="Results root folder")
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    extract_corpus(
+        results_dir=args.results,
+        model_name=args.name,
+        years=args.years,
+        parties=args.parties,
+        stats=RunStats('extract_rules', enabled=args.stats, profile=args.profile)
+    )
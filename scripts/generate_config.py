@@ -23,9 +23,14 @@ MODEL_MAPPING = {
     "mistral": "Mistral 7B Instruct",
     "grok": "grok-2.5-turbo",
     "gemini": "Gemini Thinking Modus 13.12.2025",
-    "qwen": "Qwen"
+    "qwen": "Qwen",
+    "rules": "Regelbasiert (Signalwörter)"
 }
 
+# Reference models (scripts/extract_rules.py) don't vote: they are left out of
+# config.json and the consensus clusters and only compared against the LLMs
+BASELINE_MODELS = {"rules"}
+
 def get_party_name(filename):
     name = os.path.splitext(filename)[0]
     if name in PARTY_MAPPING:
@@ -84,9 +89,12 @@ def main():
     
     # Iterate over years
     for year in years:
-        config[year] = {}
         year_dir = os.path.join(RESULTS_DIR, year)
-        models = [d for d in os.listdir(year_dir) if os.path.isdir(os.path.join(year_dir, d))]
+        models = [d for d in os.listdir(year_dir) if os.path.isdir(os.path.join(year_dir, d)) and d not in BASELINE_MODELS]
+        if not models:
+            # Only baseline results (e.g. 2002), no year of its own
+            continue
+        config[year] = {}
         
         for model in models:
             config[year][model] = []
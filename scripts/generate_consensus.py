@@ -1,34 +1,29 @@
 import os
 import json
-import unicodedata
 import difflib
-from generate_config import PARTY_MAPPING
+import time
+from generate_config import PARTY_MAPPING, BASELINE_MODELS
+from consensus_clustering import cluster_findings
+from corpus_store import load_corpus_store, find_heading
+from extract_pdf import load_page_tables, page_for_offset
+from run_stats import RunStats, parse_stats_args, MATCH_OFFSET, MATCH_EXACT, MATCH_WHITESPACE, MATCH_FUZZY, MATCH_NOT_FOUND
 
 RESULTS_DIR = 'results'
-PROGRAMS_DIR = 'programs/txt'
 OUTPUT_FILE = 'consensus_analysis.json'
-TOLERANCE = 100  # Characters distance to group findings
-
-def normalize_filename(filename):
-    if not isinstance(filename, str):
-        return ""
-    return unicodedata.normalize('NFC', filename)
-
-def build_file_map(root_dir):
-    file_map = {}
-    for root, dirs, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith('.txt'):
-                norm_name = normalize_filename(file)
-                full_path = os.path.join(root, file)
-                file_map[norm_name] = full_path
-                name_no_ext = os.path.splitext(norm_name)[0]
-                file_map[name_no_ext] = full_path
-    return file_map
+TOLERANCE = 100  # Same as the Toleranz-Bereich slider: max. distance between centers is TOLERANCE / 2
+SNIPPET_CONTEXT = 150  # Characters of context before and after a finding in the snippet table
 
 def find_quote_position_fuzzy(text, quote):
+    index, score, _ = locate_quote(text, quote)
+    return index, score
+
+def locate_quote(text, quote, fuzzy=True):
+    # Same as find_quote_position_fuzzy, but also reports which step matched.
+    # fuzzy=False skips the (slow) difflib step.
+    # text is a str or a corpus store view: the exact steps search the mmap,
+    # only the difflib step needs the decoded text.
     if not quote:
-        return -1, 0
+        return -1, 0, MATCH_NOT_FOUND
     
     # 1. Cut to 100 chars (User requirement)
     quote_short = quote[:100]
@@ -36,35 +31,85 @@ def find_quote_position_fuzzy(text, quote):
     # 2. Exact match of short quote
     index = text.find(quote_short)
     if index != -1:
-        return index, 100
+        return index, 100, MATCH_EXACT
     
     # 3. Normalized whitespace match
     quote_clean = quote_short.replace('\n', ' ').replace('\r', '')
     index = text.find(quote_clean)
     if index != -1:
-        return index, 95
+        return index, 95, MATCH_WHITESPACE
         
+    if not fuzzy:
+        return -1, 0, MATCH_NOT_FOUND
+
     # 4. Fuzzy match of short quote
-    s = difflib.SequenceMatcher(None, text, quote_short, autojunk=False)
-    match = s.find_longest_match(0, len(text), 0, len(quote_short))
+    full = str(text)
+    s = difflib.SequenceMatcher(None, full, quote_short, autojunk=False)
+    match = s.find_longest_match(0, len(full), 0, len(quote_short))
     
     if match.size > 20: 
         start_in_text = match.a - match.b
         start_in_text = max(0, start_in_text)
-        end_in_text = min(len(text), start_in_text + len(quote_short))
+        end_in_text = min(len(full), start_in_text + len(quote_short))
         # Check similarity of the found segment
-        candidate = text[start_in_text:end_in_text]
+        candidate = full[start_in_text:end_in_text]
         similarity = difflib.SequenceMatcher(None, candidate, quote_short).ratio()
         score = int(similarity * 100)
         
         if score > 60:
-            return start_in_text, score
+            return start_in_text, score, MATCH_FUZZY
             
-    return -1, 0
+    return -1, 0, MATCH_NOT_FOUND
+
+def locate_finding(text, item):
+    # Findings of the rule based extractor carry exact offsets, no need to search
+    if isinstance(item.get('start'), int) and isinstance(item.get('end'), int):
+        return item['start'], min(item['end'], len(text)), 100, MATCH_OFFSET
+
+    q = item.get('originalQuote', '')
+    start, score, method = locate_quote(text, q)
+    return start, min(start + len(q), len(text)), score, method
+
+def build_snippets(text, findings, heading_index):
+    """Context snippets for the located findings (sorted by start).
+
+    The windows of SNIPPET_CONTEXT characters around the findings are merged
+    where they overlap, so text shared by several findings (mostly the same
+    sentence found by several models) is stored once. Every finding gets the
+    id of its snippet, its text is snippet text[start - snippet start:end - snippet start].
+    """
+    snippets = []
+    for finding in findings:
+        window_start = max(0, finding['start'] - SNIPPET_CONTEXT)
+        window_end = min(len(text), finding['end'] + SNIPPET_CONTEXT)
+        if snippets and window_start <= snippets[-1]['end']:
+            snippets[-1]['end'] = max(snippets[-1]['end'], window_end)
+        else:
+            snippets.append({"start": window_start, "end": window_end, "section": find_heading(heading_index, finding['start'])})
+        finding['snippet'] = len(snippets) - 1
+
+    return [{"start": s['start'], "section": s['section'], "text": text[s['start']:s['end']]} for s in snippets]
+
+def reference_findings(clusters, findings):
+    # Clusters point to their findings by index in raw_findings instead of repeating them
+    index_of = {id(finding): i for i, finding in enumerate(findings)}
+    for cluster in clusters:
+        representative = cluster.pop('representative')
+        cluster['snippet'] = representative['snippet']
+        cluster['representative'] = index_of[id(representative)]
+        cluster['findings'] = [index_of[id(finding)] for finding in cluster['findings']]
+    return clusters
+
+def generate_consensus(stats=None):
+    if stats is None:
+        stats = RunStats('generate_consensus')
+    stats.start_profile()
 
-def generate_consensus():
-    print("Building source file map...")
-    source_file_map = build_file_map(PROGRAMS_DIR)
+    print("Opening corpus store...")
+    with stats.stage('open_corpus'):
+        corpus = load_corpus_store()
+        # Optional, written by extract_pdf.py
+        page_tables = load_page_tables()
     
     # Group results by Year -> Party -> [Models]
     data_tree = {}
@@ -104,16 +149,16 @@ def generate_consensus():
                     if not found:
                         raise ValueError(f"Unknown party file: {party_filename} (key: {party_key}) in {file_path}")
 
-                if year not in models_per_year:
-                    models_per_year[year] = set()
-                models_per_year[year].add(model)
+                # Baseline models don't vote, they are kept as comparison (baseline_findings)
+                if model not in BASELINE_MODELS:
+                    models_per_year.setdefault(year, set()).add(model)
                 
                 if year not in data_tree:
                     data_tree[year] = {}
                 if party not in data_tree[year]:
                     data_tree[year][party] = {}
                 
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with stats.stage('read_results'), open(file_path, 'r', encoding='utf-8') as f:
                     try:
                         content = json.load(f)
                         if isinstance(content, dict) and 'topics' in content:
@@ -138,139 +183,105 @@ def generate_consensus():
 
     print("Calculating consensus clusters...")
     for year in data_tree:
-        total_models_count = len(models_per_year.get(year, []))
+        if year not in models_per_year:
+            # Only baseline results (e.g. 2002), no model votes
+            continue
+        total_models_count = len(models_per_year[year])
         
         for party in data_tree[year]:
             models_data = data_tree[year][party]
             source_file_hint = models_data.get('_sourceFile', '')
-            source_path = None
+            source_document = corpus.get(source_file_hint) if source_file_hint else None
             
-            if source_file_hint:
-                hint_name = os.path.basename(source_file_hint)
-                hint_no_ext = os.path.splitext(hint_name)[0]
-                if hint_name in source_file_map:
-                    source_path = source_file_map[hint_name]
-                elif hint_no_ext in source_file_map:
-                    source_path = source_file_map[hint_no_ext]
-            
-            if not source_path:
+            if not source_document:
                 # Strict validation: if we have results but no source text, we can't verify quotes.
                 # We should probably raise an error or skip. 
                 # Given "just throw an error", I will raise.
                 raise FileNotFoundError(f"Source text not found for {party} in {year} (hint: {source_file_hint})")
                 
-            try:
-                with open(source_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-            except Exception as e:
-                raise IOError(f"Error reading source {source_path}: {e}")
+            with stats.stage('read_sources'):
+                # Quotes are searched and snippets sliced in the mmap
+                text = corpus.view(source_document)
 
-            models = [k for k in models_data.keys() if not k.startswith('_')]
+            page_table = page_tables.get(source_document['path'])
+            models = [k for k in models_data.keys() if not k.startswith('_') and k not in BASELINE_MODELS]
+            baselines = [k for k in models_data.keys() if k in BASELINE_MODELS]
             
             # Collect all findings
             all_findings = []
-            text_len = len(text)
+            baseline_findings = []
 
-            for model in models:
+            for model in models + baselines:
                 quotes = models_data[model]
                 if not quotes:
                     continue
                 
                 for item in quotes:
                     q = item.get('originalQuote', '')
-                    start, score = find_quote_position_fuzzy(text, q)
+                    match_start = time.perf_counter()
+                    start, end_pos, score, method = locate_finding(text, item)
+                    match_seconds = time.perf_counter() - match_start
+                    stats.record_match(method, match_seconds, model=model, source_file=source_file_hint, quote=q)
+                    stats.add_stage_time('locate_quotes', match_seconds)
                     
-                    if start != -1 and score > 70:
+                    if start != -1 and score > 70 and model in BASELINE_MODELS:
+                        # Only positions, the consensus view compares them with the clusters
+                        baseline_findings.append({"model": model, "start": start, "end": end_pos, "category": item.get('category', '')})
+                    elif start != -1 and score > 70:
                         # Simplified: Just use the found position and original quote length
                         # We don't need complex sentence boundary detection for consensus calculation
-                        end_pos = min(start + len(q), text_len)
-                        actual_text = text[start:end_pos]
-                        
-                        all_findings.append({
+                        # The text itself goes to the snippet table
+                        finding = {
                             "model": model,
                             "start": start,
                             "end": end_pos,
-                            "text": actual_text,
-                            "original_quote": q,
                             "category": item.get('category', ''),
                             "topic": item.get('topic', ''),
                             "classification": item.get('classification', '')
-                        })
+                        }
+                        # Only programs with a PDF (pdf_pages.json) have page numbers
+                        if page_table:
+                            finding["page"] = page_for_offset(page_table, start)
+                        all_findings.append(finding)
 
-            # Cluster findings by start position
+            # Sort by start (raw_findings order) and cluster like the consensus view does
+            cluster_start = time.perf_counter()
             all_findings.sort(key=lambda x: x['start'])
-            
-            clusters = []
-            if all_findings:
-                current_cluster = [all_findings[0]]
-                
-                for i in range(1, len(all_findings)):
-                    finding = all_findings[i]
-                    prev_finding = current_cluster[-1]
-                    
-                    # If start is within tolerance, add to cluster
-                    if finding['start'] - prev_finding['start'] < TOLERANCE:
-                        current_cluster.append(finding)
-                    else:
-                        # Finalize current cluster
-                        unique_models = set(f['model'] for f in current_cluster)
-                        vote_count = len(unique_models)
-                        confidence = vote_count / total_models_count
-                        
-                        # Use the text from the first finding
-                        best_finding = current_cluster[0]
-                        
-                        clusters.append({
-                            "text": best_finding['text'],
-                            "start": best_finding['start'],
-                            "end": best_finding['end'],
-                            "vote_count": vote_count,
-                            "total_models": total_models_count,
-                            "confidence": confidence,
-                            "findings": current_cluster
-                        })
-                        current_cluster = [finding]
-                
-                # Final cluster
-                if current_cluster:
-                    unique_models = set(f['model'] for f in current_cluster)
-                    vote_count = len(unique_models)
-                    confidence = vote_count / total_models_count
-                    best_finding = current_cluster[0]
-                    
-                    clusters.append({
-                        "text": best_finding['text'],
-                        "start": best_finding['start'],
-                        "end": best_finding['end'],
-                        "vote_count": vote_count,
-                        "total_models": total_models_count,
-                        "confidence": confidence,
-                        "findings": current_cluster
-                    })
+            clusters = cluster_findings(all_findings, TOLERANCE, total_models_count)
+
+            stats.add_stage_time('cluster', time.perf_counter() - cluster_start)
+
+            with stats.stage('snippets'):
+                snippets = build_snippets(text, all_findings, corpus.headings(source_document))
+                reference_findings(clusters, all_findings)
 
             if clusters:
-                # Calculate relative path for source file
-                source_file_rel = os.path.relpath(source_path, os.getcwd()) # Assuming script run from root or we can use WORKSPACE_ROOT logic if needed. 
-                # But wait, generate_consensus.py doesn't have WORKSPACE_ROOT defined.
-                # It uses PROGRAMS_DIR = 'programs/txt'.
-                # os.path.relpath(source_path) should work if CWD is workspace root.
+                # Path relative to the workspace root, as stored in the corpus table
+                source_file_rel = source_document['path']
                 
                 consensus_results.append({
                     "year": year,
                     "party": party,
                     "party_display": party, # Use normalized name
                     "source_file": source_file_rel,
+                    "pdf_file": page_table['pdf'] if page_table else None,
                     "total_clusters": len(clusters),
                     "total_models": total_models_count,
-                    "models": list(models_per_year[year]),
+                    "models": sorted(models_per_year[year]),
+                    "analyzed_models": sorted(models),
+                    "baseline_models": sorted(baselines),
+                    "baseline_findings": sorted(baseline_findings, key=lambda x: x['start']),
+                    "snippets": snippets,
                     "items": clusters,
                     "raw_findings": all_findings
                 })
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+    with stats.stage('write_output'), open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(consensus_results, f, indent=2, ensure_ascii=False)
     
     print(f"Consensus analysis saved to {OUTPUT_FILE}")
+    stats.write(OUTPUT_FILE)
 
 if __name__ == "__main__":
-    generate_consensus()
+    args = parse_stats_args("Locate all model findings in the source texts and cluster them into consensus items.")
+    generate_consensus(RunStats('generate_consensus', enabled=args.stats, profile=args.profile))
@@ -0,0 +1,153 @@
+# Measures throughput and latency of scripts/query_service.py. Every client keeps one HTTP/1.1
+# connection open and sends requests back to back, cycling through the paths. Without --paths a mix
+# of the service's query types is built from the /programs and /bans answers.
+# usage: python3 scripts/load_test.py [--url http://127.0.0.1:8080] [--concurrency 16] [--requests 5000]
+#            [--paths "/bans?party=spd" "/consensus?year=2021&tolerance=50"]
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import statistics
+import time
+from urllib.parse import urlsplit, quote
+
+TOLERANCES = [0, 50, 100, 200]
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client for GET requests."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = (await self.reader.readline()).split()
+        if len(status_line) < 2:
+            # Empty line: the server closed the connection instead of answering
+            raise ConnectionResetError("Connection closed without a response")
+        status = int(status_line[1])
+        length = 0
+        keep_alive = True
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+            elif name.strip().lower() == 'connection' and value.strip().lower() == 'close':
+                keep_alive = False
+        body = await self.reader.readexactly(length)
+
+        if not keep_alive:
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+
+async def build_paths(connection):
+    _, body = await connection.get('/programs')
+    programs = json.loads(body)['programs']
+    years = sorted({p['year'] for p in programs})
+    parties = sorted({p['party_key'] for p in programs})
+
+    paths = [f"/bans?party={quote(party)}" for party in parties]
+    _, body = await connection.get('/bans?limit=1000')
+    findings = json.loads(body)['findings']
+    sample = random.Random(0).sample(findings, min(50, len(findings)))
+    for finding in sample:
+        if finding['section']:
+            paths.append(f"/bans?party={quote(finding['party'])}&chapter={quote(finding['section'][:20])}")
+        paths.append(f"/quote?q={quote(finding['text'][:100])}")
+    paths += [f"/consensus?year={year}&tolerance={tolerance}" for year in years for tolerance in TOLERANCES]
+    random.Random(1).shuffle(paths)
+    return paths
+
+
+async def client(connection, paths, count, latencies, errors):
+    for _ in range(count):
+        path = next(paths)
+        started = time.perf_counter()
+        try:
+            status, _ = await connection.get(path)
+            if status != 200:
+                errors.append(f"{status} {path}")
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            errors.append(f"{e} {path}")
+            await connection.close()
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    await connection.close()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+async def run(url, concurrency, requests, paths):
+    target = urlsplit(url)
+    host, port = target.hostname or '127.0.0.1', target.port or 80
+
+    if not paths:
+        setup = Connection(host, port)
+        paths = await build_paths(setup)
+        await setup.close()
+    logging.info("Sending %d requests over %d connections (%d distinct paths)", requests, concurrency, len(paths))
+
+    cycle = itertools.cycle(paths)
+    latencies = []
+    errors = []
+    per_client = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(Connection(host, port), cycle, count, latencies, errors) for count in per_client))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies) + len(errors),
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3)
+        } if latencies else {},
+        "first_errors": errors[:5]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput and latency of the query service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Base URL of the query service")
+    parser.add_argument("--concurrency", type=int, default=16, help="Parallel connections")
+    parser.add_argument("--requests", type=int, default=5000, help="Total number of requests")
+    parser.add_argument("--paths", nargs="+", help="Request paths to cycle through (default: generated query mix)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    result = asyncio.run(run(args.url, args.concurrency, args.requests, args.paths))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Local stand-in for an OpenAI-compatible chat completions endpoint, answers with the
+# sentences of the submitted text that contain a ban signal word (schema of PROMPT.md).
+# usage: python3 scripts/mock_llm_server.py [--port 8000] [--delay 0.1] [--fail-rate 0.2]
+# (--fail-rate answers a share of the requests with 429/503 to exercise the client retries)
+
+import argparse
+import json
+import logging
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNAL_PATTERN = re.compile(r'verbot|verbiete|untersag|dürfen nicht|darf nicht|lehnen .{0,80}? ab|keine neuen', re.IGNORECASE)
+SENTENCE_PATTERN = re.compile(r'[^.!?\n]+[.!?]?')
+
+
+def build_answer(message):
+    source_file, _, text = message.partition('\n\n')
+    source_file = source_file.replace('Dateiname:', '').strip()
+
+    topics = []
+    for match in SENTENCE_PATTERN.finditer(text):
+        sentence = match.group(0).strip()
+        if len(sentence) < 20 or not SIGNAL_PATTERN.search(sentence):
+            continue
+        explicit = re.search(r'verbot|verbiete|untersag', sentence, re.IGNORECASE)
+        topics.append({
+            "category": "explizites Verbot" if explicit else "semantisches Verbot",
+            "topic": sentence[:60],
+            "location": "",
+            "originalQuote": sentence[:100]
+        })
+    return {"sourceFile": source_file, "topics": topics}
+
+
+class Handler(BaseHTTPRequestHandler):
+    delay = 0.0
+    fail_rate = 0.0
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length).decode('utf-8'))
+
+        if self.delay:
+            time.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            status = random.choice([429, 503])
+            self._send_json(status, {"error": {"message": "simulated failure"}}, {"Retry-After": "1"})
+            return
+
+        user_messages = [m["content"] for m in request.get("messages", []) if m.get("role") == "user"]
+        answer = build_answer(user_messages[-1] if user_messages else "")
+        self._send_json(200, {
+            "id": "mock",
+            "object": "chat.completion",
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(answer, ensure_ascii=False, indent=2)}
+            }]
+        })
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI-compatible chat completions endpoint.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 429/503")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s: %(message)s")
+    Handler.delay = args.delay
+    Handler.fail_rate = args.fail_rate
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    logging.info("Mock endpoint listening on http://%s:%d/v1", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import os
+import json
+import heapq
+import bisect
+from run_stats import RunStats, parse_stats_args
+
+INPUT_FILE = 'consensus_analysis.json'
+OUTPUT_FILE = 'model_agreement.json'
+
+ALL_YEARS = 'all'
+
+# Same category filters as the consensus view (filter-consensus-mode)
+MODES = {
+    'all': lambda finding: True,
+    'explicit': lambda finding: 'explizit' in (finding.get('category') or '').lower()
+}
+
+
+def sweep_overlaps(findings):
+    """Find overlapping findings with a sweep over the start positions.
+
+    Two findings overlap if start < other.end and end > other.start (the
+    rule used by the consensus view). Returns, per finding, the set of
+    models with an overlapping finding and the id of its overlap component
+    (a run of findings connected by overlaps). Runs in O(n log n + k) for
+    k overlapping pairs instead of comparing all pairs.
+    """
+    order = sorted(range(len(findings)), key=lambda i: (findings[i]['start'], findings[i]['end']))
+    overlaps = [set() for _ in findings]
+    components = [0] * len(findings)
+
+    active = []  # heap of (end, index) of findings that may still overlap
+    component = -1
+    reach = -1
+    for i in order:
+        finding = findings[i]
+        while active and active[0][0] <= finding['start']:
+            heapq.heappop(active)
+        for _, j in active:
+            overlaps[i].add(findings[j]['model'])
+            overlaps[j].add(finding['model'])
+        heapq.heappush(active, (finding['end'], i))
+
+        if finding['start'] >= reach:
+            component += 1
+        reach = max(reach, finding['end'])
+        components[i] = component
+
+    return overlaps, components
+
+
+def majority_spans(findings, analyzed_models):
+    """Position ranges of the findings found by the majority of the models.
+
+    The overlap components of the findings are the candidates, a component
+    is a majority finding if more than half of the analyzed models have a
+    finding in it. The findings of a component overlap each other in a
+    chain, so the component covers one range [start, end) and the ranges
+    don't overlap. Returns the ranges and their models, ordered by position.
+    """
+    _, components = sweep_overlaps(findings)
+    spans = {}
+    for finding, component in zip(findings, components):
+        if component not in spans:
+            spans[component] = [finding['start'], finding['end'], set()]
+        span = spans[component]
+        span[1] = max(span[1], finding['end'])
+        span[2].add(finding['model'])
+    return [span for _, span in sorted(spans.items()) if len(span[2]) > len(analyzed_models) / 2]
+
+
+def overlapped_spans(spans, ends, finding):
+    """Indices of the spans (ordered, disjoint) that overlap the finding."""
+    i = bisect.bisect_right(ends, finding['start'])
+    while i < len(spans) and spans[i][0] < finding['end']:
+        yield i
+        i += 1
+
+
+def empty_bucket(models):
+    size = len(models)
+    return {
+        "agree": [[0] * size for _ in range(size)],
+        "shared": [[0] * size for _ in range(size)],
+        "stats": {}
+    }
+
+
+def model_stats(bucket, model):
+    if model not in bucket["stats"]:
+        bucket["stats"][model] = {
+            "findings": 0,
+            "corroborated": 0,
+            "majority_findings": 0,
+            "majority_hits": 0,
+            "majority_total": 0
+        }
+    return bucket["stats"][model]
+
+
+def add_document(buckets, model_index, findings, analyzed_models, baseline_findings=(), baseline_models=()):
+    # With one model every finding would be its own majority
+    if len(analyzed_models) < 2:
+        return
+
+    # The majority is formed by the voting models only, the baseline is
+    # scored against it like the models but doesn't help form it
+    spans = majority_spans(findings, analyzed_models)
+    ends = [span[1] for span in spans]
+    findings = findings + list(baseline_findings)
+    analyzed_models = list(analyzed_models) + list(baseline_models)
+    overlaps, _ = sweep_overlaps(findings)
+
+    hits = {}  # model -> indices of the majority spans it found
+    majority = []
+    for finding in findings:
+        found = list(overlapped_spans(spans, ends, finding))
+        hits.setdefault(finding['model'], set()).update(found)
+        majority.append(bool(found))
+
+    for bucket in buckets:
+        for model in analyzed_models:
+            stats = model_stats(bucket, model)
+            stats["majority_total"] += len(spans)
+            stats["majority_hits"] += len(hits.get(model, ()))
+
+        for finding, others, in_majority in zip(findings, overlaps, majority):
+            model = finding['model']
+            a = model_index[model]
+            stats = model_stats(bucket, model)
+            stats["findings"] += 1
+            if others - {model}:
+                stats["corroborated"] += 1
+            if in_majority:
+                stats["majority_findings"] += 1
+
+            for other in analyzed_models:
+                b = model_index[other]
+                bucket["shared"][a][b] += 1
+                if other == model or other in others:
+                    bucket["agree"][a][b] += 1
+
+
+def finalize_bucket(bucket):
+    for stats in bucket["stats"].values():
+        stats["precision"] = round(stats["majority_findings"] / stats["findings"], 4) if stats["findings"] else 0
+        stats["recall"] = round(stats["majority_hits"] / stats["majority_total"], 4) if stats["majority_total"] else 0
+    return bucket
+
+
+def compute_agreement(consensus_data, stats=None):
+    if stats is None:
+        stats = RunStats('model_agreement')
+
+    models = sorted({m for party in consensus_data for m in party.get('models', [])} |
+                    {f['model'] for party in consensus_data for f in party.get('raw_findings', [])})
+    baseline_models = sorted({m for party in consensus_data for m in party.get('baseline_models', [])})
+    # Baseline models (rule based reference) come last in the matrix
+    models += [m for m in baseline_models if m not in models]
+    model_index = {m: i for i, m in enumerate(models)}
+    result = {"models": models, "baseline_models": baseline_models, "modes": {}}
+
+    for mode, accept in MODES.items():
+        buckets = {ALL_YEARS: empty_bucket(models)}
+        for party in consensus_data:
+            year = party['year']
+            if year not in buckets:
+                buckets[year] = empty_bucket(models)
+
+            findings = [f for f in party.get('raw_findings', []) if accept(f) and f['end'] > f['start']]
+            analyzed_models = party.get('analyzed_models') or sorted({f['model'] for f in party.get('raw_findings', [])})
+            baseline = [f for f in party.get('baseline_findings', []) if accept(f) and f['end'] > f['start']]
+
+            with stats.stage('sweep'):
+                add_document([buckets[ALL_YEARS], buckets[year]], model_index, findings, analyzed_models,
+                             baseline, party.get('baseline_models', []))
+
+        result["modes"][mode] = {year: finalize_bucket(bucket) for year, bucket in sorted(buckets.items())}
+
+    return result
+
+
+def generate_agreement(stats=None):
+    if stats is None:
+        stats = RunStats('model_agreement')
+    stats.start_profile()
+
+    if not os.path.exists(INPUT_FILE):
+        raise FileNotFoundError(f"{INPUT_FILE} not found, run generate_consensus.py first")
+
+    with stats.stage('read_consensus'), open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        consensus_data = json.load(f)
+
+    print("Calculating model agreement...")
+    result = compute_agreement(consensus_data, stats)
+
+    # Compact output, the file is loaded by the browser
+    with stats.stage('write_output'), open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"Model agreement saved to {OUTPUT_FILE}")
+    stats.write(OUTPUT_FILE)
+
+
+if __name__ == "__main__":
+    args = parse_stats_args("Compute pairwise model agreement and precision/recall against the majority from the consensus findings.")
+    generate_agreement(RunStats('model_agreement', enabled=args.stats, profile=args.profile))
@@ -0,0 +1,80 @@
+import os
+import re
+import unicodedata
+from generate_config import PARTY_MAPPING
+
+WORKSPACE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMS_DIR = os.path.join(WORKSPACE_ROOT, 'programs', 'txt')
+
+# Maps the party prefix of a program file name ("<Party> - <Year> - ...") to the
+# result file key used in PARTY_MAPPING (results/<year>/<model>/<key>.json)
+SOURCE_PREFIX_MAPPING = {
+    "afd": "afd",
+    "cdu-csu": "cducsu",
+    "fdp": "fdp",
+    "grüne": "grüne",
+    "linke": "linke",
+    "linkspartei-pds": "linke",
+    "pds": "linke",
+    "die partei": "partei",
+    "piraten": "piraten",
+    "spd": "spd"
+}
+
+# Files produced by split_text.py, the catalog always uses the complete program
+PART_FILE_PATTERN = re.compile(r'_part\d+$')
+
+
+def normalize_filename(filename):
+    if not isinstance(filename, str):
+        return ""
+    return unicodedata.normalize('NFC', filename)
+
+
+def party_key_for_source(filename):
+    name = normalize_filename(os.path.basename(filename))
+    prefix = name.split(' - ')[0].strip().lower()
+    return SOURCE_PREFIX_MAPPING.get(prefix)
+
+
+def find_programs(programs_dir=PROGRAMS_DIR, years=None, parties=None):
+    """Return one program text per (year, party) found under programs_dir.
+
+    If a party has several texts for one year (e.g. Kurz- and Langfassung),
+    the largest file is used. Entries are sorted by year and party key.
+    """
+    candidates = {}
+    for root, dirs, files in os.walk(programs_dir):
+        for file in files:
+            if not file.endswith('.txt'):
+                continue
+            name_no_ext = os.path.splitext(normalize_filename(file))[0]
+            if PART_FILE_PATTERN.search(name_no_ext):
+                continue
+
+            party_key = party_key_for_source(file)
+            if not party_key:
+                continue
+
+            year = os.path.relpath(root, programs_dir).split(os.sep)[0]
+            if not year.isdigit():
+                continue
+            if years and year not in years:
+                continue
+            if parties and party_key not in parties:
+                continue
+
+            path = os.path.join(root, file)
+            size = os.path.getsize(path)
+            current = candidates.get((year, party_key))
+            if current is None or size > current['size']:
+                candidates[(year, party_key)] = {
+                    "year": year,
+                    "party_key": party_key,
+                    "party": PARTY_MAPPING[party_key],
+                    "sourceFile": normalize_filename(file),
+                    "path": path,
+                    "size": size
+                }
+
+    return [candidates[key] for key in sorted(candidates)]
@@ -0,0 +1,354 @@
+# Read-only HTTP query service over the program catalog, the located findings and the consensus data.
+# Everything is loaded once at startup (consensus_analysis.json, pdf_pages.json if present, the corpus
+# store stays mapped) and queries are answered from memory, with the matching and clustering functions
+# of generate_consensus.py and consensus_clustering.py. Responses are JSON, the X-Query-Ms header holds
+# the time spent on the query (scripts/load_test.py measures throughput).
+#   GET /health
+#   GET /programs                           catalog, one program per year and party
+#   GET /bans?party=cducsu&chapter=Energie  located findings, filters: party, year, model, chapter (substring
+#                                           of the section heading), category (explicit|semantic), limit
+#   GET /quote?q=...&year=2021&party=spd    where is this quote (year/party optional, fuzzy=1 enables the
+#                                           difflib step for one program)
+#   GET /consensus?year=2021&tolerance=100  consensus clusters like the frontend shows them,
+#                                           filters: party, models (comma separated), mode (all|explicit)
+# usage: python3 scripts/query_service.py [--host 127.0.0.1] [--port 8080]
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlsplit, parse_qs
+
+from generate_config import PARTY_MAPPING
+from program_catalog import WORKSPACE_ROOT, find_programs
+from corpus_store import load_corpus_store
+from consensus_clustering import cluster_findings
+from generate_consensus import locate_quote, TOLERANCE
+from extract_pdf import load_page_tables, page_for_offset
+
+CONSENSUS_FILE = os.path.join(WORKSPACE_ROOT, 'consensus_analysis.json')
+
+DEFAULT_LIMIT = 100
+MAX_QUOTE_MATCHES = 20
+CLUSTER_CACHE_SIZE = 256
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def normalize_quote(quote):
+    return re.sub(r'\s+', ' ', quote or '').strip().lower()
+
+
+def resolve_party(value):
+    """Party display name for a result key ("cducsu") or display name ("CDU/CSU"), any case."""
+    if not value:
+        return None
+    lowered = value.strip().lower()
+    for key, name in PARTY_MAPPING.items():
+        if lowered in (key.lower(), name.lower()):
+            return name
+    raise QueryError(400, f"Unknown party: {value}")
+
+
+class QueryIndex:
+    """In-memory indexes the service answers from."""
+
+    def __init__(self):
+        # Quotes are searched in the mmap, texts are never decoded as a whole
+        # (except for fuzzy=1 on one program)
+        self.corpus = corpus = load_corpus_store()
+        page_tables = load_page_tables()
+
+        # Catalog (one program per year and party)
+        self.programs = []
+        self.documents = {}  # (year, party) -> corpus store document
+        self.page_tables = {}  # (year, party) -> page table
+        for program in find_programs():
+            document = corpus.by_party(program['year'], program['party_key'])
+            key = (program['year'], program['party'])
+            self.documents[key] = document
+            self.page_tables[key] = page_tables.get(document['path'])
+            self.programs.append({
+                "year": program['year'],
+                "party": program['party'],
+                "party_key": program['party_key'],
+                "source_file": document['path'],
+                "length": document['length'],
+                "pdf_file": self.page_tables[key]['pdf'] if self.page_tables[key] else None
+            })
+
+        if not os.path.exists(CONSENSUS_FILE):
+            raise FileNotFoundError(f"{CONSENSUS_FILE} not found, run generate_consensus.py first")
+        with open(CONSENSUS_FILE, 'r', encoding='utf-8') as f:
+            consensus_data = json.load(f)
+
+        # Located findings with text and section, per (year, party)
+        self.consensus = {}
+        self.findings = []
+        self.quotes = {}  # normalized quote text -> [finding]
+        for party_data in consensus_data:
+            # Offsets refer to the text the results were made from, not necessarily the catalog one
+            document = corpus.get(party_data['source_file'])
+            findings = []
+            for raw in party_data['raw_findings']:
+                snippet = party_data['snippets'][raw['snippet']]
+                finding = {
+                    "year": party_data['year'],
+                    "party": party_data['party'],
+                    "model": raw['model'],
+                    "category": raw['category'],
+                    "topic": raw['topic'],
+                    "classification": raw['classification'],
+                    "section": corpus.section(document, raw['start']) if document else "",
+                    "start": raw['start'],
+                    "end": raw['end'],
+                    "page": raw.get('page'),
+                    "text": snippet['text'][raw['start'] - snippet['start']:raw['end'] - snippet['start']]
+                }
+                findings.append(finding)
+                self.quotes.setdefault(normalize_quote(finding['text']), []).append(finding)
+            self.findings.extend(findings)
+            self.consensus[(party_data['year'], party_data['party'])] = {
+                "models": party_data['models'],
+                "source_file": party_data['source_file'],
+                "pdf_file": party_data.get('pdf_file'),
+                "findings": findings
+            }
+        self._cluster_cache = {}
+
+    def bans(self, party=None, year=None, model=None, chapter=None, category=None, limit=DEFAULT_LIMIT):
+        party = resolve_party(party)
+        chapter = chapter.lower() if chapter else None
+        if category not in (None, 'explicit', 'semantic'):
+            raise QueryError(400, f"Unknown category: {category}")
+
+        matches = []
+        for (entry_year, entry_party), entry in self.consensus.items():
+            if (party and entry_party != party) or (year and entry_year != year):
+                continue
+            for finding in entry['findings']:
+                if model and finding['model'] != model:
+                    continue
+                if chapter and chapter not in finding['section'].lower():
+                    continue
+                if category == 'explicit' and 'explizit' not in finding['category'].lower():
+                    continue
+                if category == 'semantic' and 'semantisch' not in finding['category'].lower():
+                    continue
+                matches.append(finding)
+        return {"total": len(matches), "findings": matches[:limit]}
+
+    def quote(self, q, year=None, party=None, fuzzy=False):
+        if not q:
+            raise QueryError(400, "Parameter q is required")
+        party = resolve_party(party)
+        keys = [key for key in self.documents if (not year or key[0] == year) and (not party or key[1] == party)]
+        if fuzzy and len(keys) != 1:
+            raise QueryError(400, "fuzzy=1 needs year and party (the difflib step is too slow for the whole corpus)")
+
+        # Quotes of known findings are answered from the quote index
+        known = {}
+        for finding in self.quotes.get(normalize_quote(q), []):
+            if (year and finding['year'] != year) or (party and finding['party'] != party):
+                continue
+            location = (finding['year'], finding['party'], finding['start'], finding['end'])
+            if location not in known:
+                known[location] = {key: finding[key] for key in ('year', 'party', 'start', 'end', 'page', 'section')}
+                known[location]['models'] = []
+            known[location]['models'].append(finding['model'])
+        if known:
+            return {"method": "index", "matches": list(known.values())[:MAX_QUOTE_MATCHES]}
+
+        matches = []
+        for key in keys:
+            document = self.documents[key]
+            start, score, method = locate_quote(self.corpus.view(document), q, fuzzy=fuzzy)
+            if start == -1:
+                continue
+            end = min(start + len(q[:100]), document['length'])
+            matches.append({
+                "year": key[0],
+                "party": key[1],
+                "start": start,
+                "end": end,
+                "score": score,
+                "method": method,
+                "page": page_for_offset(self.page_tables[key], start),
+                "section": self.corpus.section(document, start)
+            })
+            if len(matches) == MAX_QUOTE_MATCHES:
+                break
+        return {"method": "search", "matches": matches}
+
+    def clusters(self, year, tolerance=TOLERANCE, party=None, models=None, mode='all'):
+        if not year:
+            raise QueryError(400, "Parameter year is required")
+        if mode not in ('all', 'explicit'):
+            raise QueryError(400, f"Unknown mode: {mode}")
+        party = resolve_party(party)
+
+        result = []
+        for (entry_year, entry_party), entry in self.consensus.items():
+            if entry_year != year or (party and entry_party != party):
+                continue
+            selected = [m for m in entry['models'] if not models or m in models]
+            findings = [f for f in entry['findings']
+                        if f['model'] in selected and (mode == 'all' or 'explizit' in f['category'].lower())]
+            findings.sort(key=lambda f: f['start'])
+
+            items = []
+            for cluster in cluster_findings(findings, tolerance, len(selected)):
+                representative = cluster['representative']
+                items.append({
+                    "text": representative['text'],
+                    "start": cluster['start'],
+                    "end": cluster['end'],
+                    "page": representative.get('page'),
+                    "section": representative['section'],
+                    "vote_count": cluster['vote_count'],
+                    "total_models": cluster['total_models'],
+                    "confidence": cluster['confidence'],
+                    "models": sorted({f['model'] for f in cluster['findings']})
+                })
+            result.append({
+                "party": entry_party,
+                "source_file": entry['source_file'],
+                "pdf_file": entry['pdf_file'],
+                "total_clusters": len(items),
+                "items": items
+            })
+
+        return {"year": year, "tolerance": tolerance, "parties": result}
+
+    def clusters_body(self, year, tolerance=TOLERANCE, party=None, models=None, mode='all'):
+        """Encoded clusters() response, cached: a year's clusters are a few hundred KB of JSON."""
+        cache_key = (year, tolerance, party, tuple(models) if models else None, mode)
+        if cache_key not in self._cluster_cache:
+            if len(self._cluster_cache) >= CLUSTER_CACHE_SIZE:
+                self._cluster_cache.pop(next(iter(self._cluster_cache)))
+            self._cluster_cache[cache_key] = encode_json(self.clusters(year, tolerance, party, models, mode))
+        return self._cluster_cache[cache_key]
+
+
+def encode_json(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _int_param(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except ValueError:
+        raise QueryError(400, f"Parameter {name} must be a number")
+
+
+async def dispatch(index, target):
+    url = urlsplit(target)
+    params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    path = url.path.rstrip('/') or '/'
+
+    if path == '/health':
+        return {"status": "ok", "programs": len(index.programs), "findings": len(index.findings)}
+    if path == '/programs':
+        return {"programs": index.programs}
+    if path == '/bans':
+        return index.bans(params.get('party'), params.get('year'), params.get('model'), params.get('chapter'),
+                          params.get('category'), _int_param(params, 'limit', DEFAULT_LIMIT))
+    if path == '/quote':
+        fuzzy = params.get('fuzzy') in ('1', 'true')
+        if fuzzy:
+            # The difflib step takes seconds, keep the event loop responsive
+            return await asyncio.to_thread(index.quote, params.get('q'), params.get('year'), params.get('party'), True)
+        return index.quote(params.get('q'), params.get('year'), params.get('party'))
+    if path == '/consensus':
+        models = [m for m in params.get('models', '').split(',') if m] or None
+        return index.clusters_body(params.get('year'), _int_param(params, 'tolerance', TOLERANCE), params.get('party'),
+                              models, params.get('mode', 'all'))
+    raise QueryError(404, f"Unknown path: {url.path}")
+
+
+async def handle_connection(index, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, version = request_line.decode('latin-1').split()
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if int(headers.get('content-length', 0)):
+                await reader.readexactly(int(headers['content-length']))
+
+            started = time.perf_counter()
+            try:
+                if method not in ('GET', 'HEAD'):
+                    raise QueryError(405, f"Method {method} not allowed, the service is read-only")
+                status, payload = 200, await dispatch(index, target)
+            except QueryError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                logging.exception("Query %s failed", target)
+                status, payload = 500, {"error": str(e)}
+            query_ms = (time.perf_counter() - started) * 1000
+
+            body = payload if isinstance(payload, bytes) else encode_json(payload)
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+            head = (
+                f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"X-Query-Ms: {query_ms:.3f}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            )
+            writer.write(head.encode('latin-1') + (body if method != 'HEAD' else b''))
+            await writer.drain()
+            logging.debug("%s %s %d %.2fms", method, target, status, query_ms)
+            if not keep_alive:
+                break
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port):
+    started = time.perf_counter()
+    index = QueryIndex()
+    logging.info("Loaded %d programs and %d findings in %.1fs", len(index.programs), len(index.findings), time.perf_counter() - started)
+
+    server = await asyncio.start_server(lambda r, w: handle_connection(index, r, w), host, port)
+    logging.info("Query service listening on http://%s:%d", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve read-only queries on programs, bans, quotes and consensus from memory.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s: %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
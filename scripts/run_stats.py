@@ -0,0 +1,150 @@
+import os
+import io
+import json
+import time
+import cProfile
+import pstats
+import argparse
+from contextlib import contextmanager
+
+# Match methods reported by the quote locators (see find_quote_position_fuzzy)
+MATCH_EXACT = 'exact'
+MATCH_WHITESPACE = 'whitespace'
+MATCH_FUZZY = 'fuzzy'
+MATCH_NOT_FOUND = 'not_found'
+MATCH_OFFSET = 'offset'  # Finding came with exact offsets (rule based extractor)
+MATCH_METHODS = [MATCH_OFFSET, MATCH_EXACT, MATCH_WHITESPACE, MATCH_FUZZY, MATCH_NOT_FOUND]
+
+SLOWEST_LIMIT = 20  # Number of slowest (file, quote) pairs to keep
+PROFILE_TOP = 30  # Number of functions listed from the cProfile output
+
+
+def add_stats_arguments(parser):
+    parser.add_argument("--stats", action="store_true", help="Write per-stage timings and match counters to a stats JSON next to the output")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile and write a .prof file next to the output (implies --stats)")
+
+
+def parse_stats_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    add_stats_arguments(parser)
+    return parser.parse_args()
+
+
+def stats_path_for(output_file):
+    return os.path.splitext(output_file)[0] + '_stats.json'
+
+
+def profile_path_for(output_file):
+    return os.path.splitext(output_file)[0] + '.prof'
+
+
+def _empty_counters():
+    counters = {method: 0 for method in MATCH_METHODS}
+    counters['seconds'] = 0.0
+    return counters
+
+
+class RunStats:
+    """Collects stage timings and quote matching counters for one script run.
+
+    Counting is always on (it is cheap), the results are only written
+    when the script was started with --stats or --profile.
+    """
+
+    def __init__(self, script, enabled=False, profile=False):
+        self.script = script
+        self.enabled = enabled or profile
+        self.profile = profile
+        self.stages = {}
+        self.matches = _empty_counters()
+        self.per_model = {}
+        self.slowest = []
+        self._profiler = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - start)
+
+    def add_stage_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def record_match(self, method, seconds, model=None, source_file=None, quote=None):
+        self.matches[method] += 1
+        self.matches['seconds'] += seconds
+
+        if model is not None:
+            if model not in self.per_model:
+                self.per_model[model] = _empty_counters()
+            self.per_model[model][method] += 1
+            self.per_model[model]['seconds'] += seconds
+
+        if not self.enabled:
+            return
+
+        # Keep only the slowest pairs, the list stays short so sorting is fine
+        if len(self.slowest) < SLOWEST_LIMIT or seconds > self.slowest[-1]['seconds']:
+            self.slowest.append({
+                "seconds": round(seconds, 4),
+                "method": method,
+                "model": model,
+                "sourceFile": source_file,
+                "quote": (quote or '')[:100]
+            })
+            self.slowest.sort(key=lambda x: x['seconds'], reverse=True)
+            del self.slowest[SLOWEST_LIMIT:]
+
+    def start_profile(self):
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self, output_file):
+        if not self._profiler:
+            return None
+        self._profiler.disable()
+        prof_path = profile_path_for(output_file)
+        self._profiler.dump_stats(prof_path)
+
+        buffer = io.StringIO()
+        pstats.Stats(self._profiler, stream=buffer).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        self._profiler = None
+        print(f"Profile saved to {prof_path}")
+        return buffer.getvalue()
+
+    def to_dict(self):
+        def rounded(counters):
+            return {k: (round(v, 4) if isinstance(v, float) else v) for k, v in counters.items()}
+
+        data = {
+            "script": self.script,
+            "totalSeconds": round(time.perf_counter() - self._started, 4),
+            "stages": {k: round(v, 4) for k, v in self.stages.items()}
+        }
+        # Scripts that don't locate quotes get no (all zero) match section
+        if any(self.matches[method] for method in MATCH_METHODS):
+            data["matches"] = rounded(self.matches)
+            data["perModel"] = {m: rounded(c) for m, c in sorted(self.per_model.items())}
+            data["slowest"] = self.slowest
+        return data
+
+    def write(self, output_file):
+        profile_summary = self.stop_profile(output_file)
+        if not self.enabled:
+            return
+
+        data = self.to_dict()
+        if profile_summary:
+            data["profile"] = {
+                "file": profile_path_for(output_file),
+                "top": profile_summary.splitlines()
+            }
+
+        stats_path = stats_path_for(output_file)
+        with open(stats_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"Run stats saved to {stats_path}")
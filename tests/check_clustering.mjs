@@ -0,0 +1,30 @@
+// Checks js/clustering.js against the cases shared with scripts/consensus_clustering.py
+// (tests/test_consensus_clustering.py runs the same cases against the script).
+// usage: node tests/check_clustering.mjs
+import { readFileSync } from 'fs';
+import { deepStrictEqual } from 'assert';
+import { clusterFindings } from '../js/clustering.js';
+
+const cases = JSON.parse(readFileSync(new URL('./fixtures/clustering.json', import.meta.url), 'utf-8'));
+
+let failed = 0;
+cases.forEach(testCase => {
+    const [party] = clusterFindings([{ raw_findings: testCase.findings, total_models: testCase.total_models }], testCase.tolerance);
+    const clusters = party.items.map(cluster => ({
+        findings: cluster.findings.map(f => f.id),
+        start: cluster.start,
+        end: cluster.end,
+        vote_count: cluster.vote_count,
+        confidence: cluster.confidence,
+        representative: cluster.representative.id
+    }));
+    try {
+        deepStrictEqual(clusters, testCase.clusters);
+    } catch (err) {
+        failed++;
+        console.error(`FAIL ${testCase.name}: ${testCase.description}\n${err.message}`);
+    }
+});
+
+console.log(`${cases.length - failed}/${cases.length} clustering cases passed`);
+process.exit(failed ? 1 : 0);
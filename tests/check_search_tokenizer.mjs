@@ -0,0 +1,22 @@
+// Checks tokenize()/shardFor() of js/search.js against the cases shared with
+// scripts/build_search_index.py (tests/test_search_tokenizer.py runs the same cases against the script).
+// usage: node tests/check_search_tokenizer.mjs
+import { readFileSync } from 'fs';
+import { deepStrictEqual } from 'assert';
+import { tokenize, shardFor } from '../js/search.js';
+
+const { manifest, cases } = JSON.parse(readFileSync(new URL('./fixtures/search_tokenizer.json', import.meta.url), 'utf-8'));
+
+let failed = 0;
+cases.forEach(testCase => {
+    const terms = tokenize(testCase.text, manifest).map(term => [term, shardFor(term, manifest)]);
+    try {
+        deepStrictEqual(terms, testCase.terms);
+    } catch (err) {
+        failed++;
+        console.error(`FAIL ${testCase.name}: ${testCase.description}\n${err.message}`);
+    }
+});
+
+console.log(`${cases.length - failed}/${cases.length} tokenizer cases passed`);
+process.exit(failed ? 1 : 0);
@@ -0,0 +1,40 @@
+# Checks scripts/consensus_clustering.py against the cases shared with js/clustering.js
+# (tests/check_clustering.mjs runs the same cases against the frontend).
+# usage: python3 -m pytest tests  (or python3 -m unittest discover tests)
+import os
+import sys
+import json
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'scripts'))
+
+from consensus_clustering import cluster_findings
+
+FIXTURES = os.path.join(TESTS_DIR, 'fixtures', 'clustering.json')
+
+
+def summarize(cluster):
+    return {
+        "findings": [f['id'] for f in cluster['findings']],
+        "start": cluster['start'],
+        "end": cluster['end'],
+        "vote_count": cluster['vote_count'],
+        "confidence": cluster['confidence'],
+        "representative": cluster['representative']['id']
+    }
+
+
+class ClusterFindingsTest(unittest.TestCase):
+    def test_shared_fixtures(self):
+        with open(FIXTURES, 'r', encoding='utf-8') as f:
+            cases = json.load(f)
+
+        for case in cases:
+            with self.subTest(case['name']):
+                clusters = cluster_findings(case['findings'], case['tolerance'], case['total_models'])
+                self.assertEqual([summarize(c) for c in clusters], case['clusters'], case['description'])
+
+
+if __name__ == '__main__':
+    unittest.main()
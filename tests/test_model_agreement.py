@@ -0,0 +1,56 @@
+# Checks the majority vote of scripts/model_agreement.py: programs with a single
+# analyzed model are skipped, the baseline (rule based reference model) is scored
+# against the majority but doesn't vote.
+# usage: python3 -m pytest tests  (or python3 -m unittest discover tests)
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'scripts'))
+
+from model_agreement import compute_agreement
+
+
+def program(findings, analyzed_models, baseline_findings=(), year='2021'):
+    return {
+        "year": year,
+        "models": analyzed_models,
+        "analyzed_models": analyzed_models,
+        "raw_findings": [{"model": m, "start": s, "end": e, "category": "explizites Verbot"} for m, s, e in findings],
+        "baseline_models": ['rules'] if baseline_findings else [],
+        "baseline_findings": [{"model": 'rules', "start": s, "end": e, "category": "explizites Verbot"} for s, e in baseline_findings]
+    }
+
+
+def stats(result, model, year='all'):
+    return result['modes']['all'][year]['stats'].get(model)
+
+
+class MajorityTest(unittest.TestCase):
+    def test_single_model_program_is_skipped(self):
+        result = compute_agreement([program([('a', 0, 10), ('a', 50, 60)], ['a'], year='2002')])
+        self.assertIsNone(stats(result, 'a'))
+
+    def test_baseline_does_not_vote(self):
+        # a and b agree on 0-10, only a found 100-110: two models, a majority needs both.
+        # With the baseline as third voter 100-110 would become a majority finding.
+        result = compute_agreement([program([('a', 0, 10), ('b', 5, 15), ('a', 100, 110)], ['a', 'b'],
+                                            baseline_findings=[(0, 8), (100, 105), (300, 310)])])
+
+        a = stats(result, 'a')
+        self.assertEqual((a['findings'], a['majority_findings'], a['majority_total'], a['majority_hits']), (2, 1, 1, 1))
+        rules = stats(result, 'rules')
+        self.assertEqual((rules['findings'], rules['majority_findings'], rules['majority_hits']), (3, 1, 1))
+        self.assertAlmostEqual(rules['precision'], 0.3333)
+        self.assertEqual(rules['recall'], 1.0)
+
+    def test_baseline_does_not_join_components(self):
+        # The baseline finding bridges a and b, which don't overlap each other
+        result = compute_agreement([program([('a', 0, 10), ('b', 20, 30)], ['a', 'b'], baseline_findings=[(5, 25)])])
+        self.assertEqual(stats(result, 'a')['majority_total'], 0)
+        self.assertEqual(stats(result, 'rules')['majority_findings'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
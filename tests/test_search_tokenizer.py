@@ -0,0 +1,40 @@
+# Checks tokenize()/shard_for() of scripts/build_search_index.py against the cases shared with
+# js/search.js (tests/check_search_tokenizer.mjs runs the same cases against the frontend).
+# usage: python3 -m pytest tests  (or python3 -m unittest discover tests)
+import os
+import sys
+import json
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'scripts'))
+
+from build_search_index import tokenize, shard_for, NUM_SHARDS, PREFIX_LENGTH, MIN_TERM_LENGTH, STOPWORDS
+
+FIXTURES = os.path.join(TESTS_DIR, 'fixtures', 'search_tokenizer.json')
+
+
+class SearchTokenizerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(FIXTURES, 'r', encoding='utf-8') as f:
+            cls.fixtures = json.load(f)
+
+    def test_manifest_settings(self):
+        # The JS check reads these settings like the manifest.json of the index
+        self.assertEqual(self.fixtures['manifest'], {
+            "shards": NUM_SHARDS,
+            "prefixLength": PREFIX_LENGTH,
+            "minTermLength": MIN_TERM_LENGTH,
+            "stopwords": sorted(STOPWORDS)
+        })
+
+    def test_shared_fixtures(self):
+        for case in self.fixtures['cases']:
+            with self.subTest(case['name']):
+                terms = [[term, shard_for(term)] for term, _ in tokenize(case['text'])]
+                self.assertEqual(terms, case['terms'], case['description'])
+
+
+if __name__ == '__main__':
+    unittest.main()